@@ -0,0 +1,36 @@
+# Benchmarks for the API and scrapers
+# Run from the backend directory, e.g. python -m benchmarks.query_plans
+import random
+from datetime import date, timedelta
+from database import times
+
+# Half hour start times from 8 AM, as the scrapers send them
+CLOCK = [times.clock(hour * 60 + minute) for hour in range(8, 22) for minute in (0, 30)]
+PLACES = ("Student Union", "Cox Pavilion", "Lied Library", "Beam Hall", "Café Rebel", "Thomas & Mack")
+
+def synthetic_events(rows, long_share=0, long_days=60, words=None, columns=None, start=date(2024, 1, 1), days=3 * 365):
+    """
+    Random events spread over days days from start, as column dicts ready for an insert.
+    long_share of them last from one to long_days days, the rest end the day they start.
+    Names are "Event <i>", or three of words when given. columns keeps only those keys,
+    for tables without a location, organization or link.
+    """
+    for i in range(rows):
+        day = start + timedelta(days=random.randrange(days))
+        end_day = day + timedelta(days=random.randrange(1, long_days)) if long_share and random.random() < long_share else day
+        start_time = random.choice(CLOCK[:-4])
+        end_time = CLOCK[CLOCK.index(start_time) + random.randrange(1, 5)]
+        start_at, end_at = times.event_span(day, start_time, end_day, end_time)
+        event = {
+            'name': " ".join(random.sample(words, 3)).title() + f" {i}" if words else f"Event {i}",
+            'startDate': day,
+            'startTime': start_time,
+            'endDate': end_day,
+            'endTime': end_time,
+            'startAt': start_at,
+            'endAt': end_at,
+            'location': random.choice(PLACES),
+            'organization': f"{random.choice(words).title() + ' ' if words else ''}Club {i % 500}",
+            'link': f"https://involvementcenter.unlv.edu/event/{i}",
+        }
+        yield {key: value for key, value in event.items() if key in columns} if columns else event
@@ -0,0 +1,80 @@
+"""
+Parse time per page for the BeautifulSoup scrapers, per HTML parser
+
+Builds synthetic pages shaped like the academic calendar, Rebel Coverage and
+UNLV calendar, then times each scraper's parse() with every parser that is
+installed. The UNLV calendar is also timed with the old per-event
+find_previous() date lookup, which rescans the page for every event.
+
+    python -m benchmarks.html_parsing [--events 2000]
+"""
+import argparse
+import time
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+from webscraping import academic_calendar, parsing, rebel_coverage, unlv_calendar
+
+def academic_calendar_page(events):
+    rows = "".join(f"<tr><td>Monday, January {i % 28 + 1}, 2025</td><td>Deadline {i}</td></tr>" for i in range(events))
+    notices = "<tr><td>*</td><td>Notice</td></tr>" * 3
+    return (f"<html><body><table><tr><td class='block_content' colspan='2'><p>Academic Calendar</p>"
+            f"<table border='1'>{rows}{notices}</table></td></tr></table></body></html>")
+
+def rebel_coverage_page(events):
+    rows = []
+    for i in range(events):
+        if i % 5 == 0:
+            rows.append(f"<tr><th>\nSATURDAY\nApril {i % 28 + 1}, 2025</th></tr>")
+        rows.append(f"<tr><th>\nBaseball vs. Team {i}\n</th><td>7:00 PM</td>"
+                    f"<td class='hide-on-medium-down'>Baseball</td><td><a href='https://unlvrebels.com/game/{i}'>Watch</a></td></tr>")
+    return f"<html><body><table><tr><th>Header</th></tr>{''.join(rows)}</table></body></html>"
+
+def unlv_calendar_page(events):
+    days = []
+    for day in range(0, events, 10):
+        items = "".join(
+            f"<div class='row'><div class='col-sm-10'><a href='/event/{i}'>Event {i}</a></div>"
+            f"<div class='col-sm-2'>6:00 PM</div><div class='col-sm-12 text-sm'>Student Union</div></div>"
+            for i in range(day, min(day + 10, events)))
+        days.append(f"<div class='card'><div class='card-header'>Friday, April {day // 10 % 28 + 1}, 2025</div>"
+                    f"<div class='card-body'>{items}</div></div>")
+    return f"<html><body><div class='container'>{''.join(days)}</div></body></html>"
+
+def unlv_calendar_find_previous(html):
+    # Date lookup as the scraper used to do it
+    soup = BeautifulSoup(html, parsing.PARSER)
+    for event in soup.find_all("div", class_="col-sm-10"):
+        event.find_next_sibling("div", class_="col-sm-2")
+        event.find_next_sibling("div", class_="col-sm-12 text-sm")
+        event.find_previous("div", class_="card-header")
+
+def timed(function, html, repeat):
+    begin = time.perf_counter()
+    for _ in range(repeat):
+        function(html)
+    return (time.perf_counter() - begin) / repeat * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = {
+        'academic_calendar': (academic_calendar.parse, academic_calendar_page(args.events)),
+        'rebel_coverage': (rebel_coverage.parse, rebel_coverage_page(args.events)),
+        'unlv_calendar': (unlv_calendar.parse, unlv_calendar_page(args.events)),
+        'unlv_calendar (find_previous)': (unlv_calendar_find_previous, unlv_calendar_page(args.events)),
+    }
+    installed = [name for name in ("html.parser", "lxml", "html5lib") if builder_registry.lookup(name)]
+    print(f"{args.events} events per page, ms per page")
+    print(f"  {'page':<32}" + "".join(f"{name:>14}" for name in installed))
+    for page, (parse, html) in pages.items():
+        times = []
+        for name in installed:
+            parsing.PARSER = name
+            times.append(timed(parse, html, args.repeat))
+        print(f"  {page:<32}" + "".join(f"{elapsed:14.1f}" for elapsed in times))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Daily, weekly and monthly range queries when events span several days
+
+Fills a throwaway SQLite database with synthetic Involvement Center events,
+a share of them lasting from a day up to two months, and times four ways
+of answering the range endpoints:
+
+    start only   startAt in the range, what the endpoints did before (misses
+                 events that started earlier and are still running)
+    dates        startDate <= last day AND endDate >= first day
+    instants     startAt < end AND endAt > start
+    R*Tree       serve_data.overlap_filter, through the <table>_span R*Tree
+
+    python -m benchmarks.overlap_queries [--rows 200000] [--long 0.2]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+from sqlalchemy import create_engine, insert, select, text
+from sqlalchemy.orm import Session
+from database import times
+from database.serve_data import db, InvolvementCenter, overlap_filter, view_range
+from benchmarks import synthetic_events
+
+def range_queries(table, first, last):
+    # first and last local dates of the view, like the resources in serve_data
+    start, end = times.midnight(first), times.midnight(last + timedelta(days=1))
+    return {
+        'start only': select(table).filter(table.startAt >= start, table.startAt < end),
+        'dates': select(table).filter(table.startDate <= last, table.endDate >= first),
+        'instants': select(table).filter(table.startAt < end, table.endAt > start),
+        'R*Tree': select(table).filter(*overlap_filter(table, start, end)),
+    }
+
+def report(session, table, view, day, repeat):
+    first, end_date = view_range(view, day.isoformat())
+    for name, statement in range_queries(table, first, end_date - timedelta(days=1)).items():
+        statement = statement.order_by(table.startAt)
+        sql = str(statement.compile(session.bind, compile_kwargs={'literal_binds': True}))
+        plan = [row[-1] for row in session.execute(text("EXPLAIN QUERY PLAN " + sql))]
+        begin = time.perf_counter()
+        for _ in range(repeat):
+            found = len(session.execute(statement).all())
+        elapsed = (time.perf_counter() - begin) / repeat * 1000
+        print(f"  {view:<8} {name:<11} {elapsed:8.2f} ms  {found:6d} events   {' | '.join(plan)}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--long", type=float, default=0.2, help="share of events lasting more than a day")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(472)
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    table = InvolvementCenter
+    # create_all also builds the span R*Tree and its triggers
+    db.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(table.__table__), list(synthetic_events(args.rows, long_share=args.long)))
+        connection.execute(text("ANALYZE"))
+
+    day = date(2025, 3, 3)
+    print(f"{args.rows} events, {args.long:.0%} lasting up to 60 days")
+    with Session(engine) as session:
+        for view in ('daily', 'weekly', 'monthly'):
+            report(session, table, view, day, args.repeat)
+    engine.dispose()
+    os.remove(path)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Query plans for the list and range endpoints, before and after the table indexes
+
+Fills a throwaway SQLite database with synthetic Involvement Center events,
+then prints EXPLAIN QUERY PLAN and timings for the queries behind the
+*_List, *_Daily, *_Weekly, *_Monthly and *_Delete_Past resources. The span
+R*Tree behind the range queries stays in both runs, benchmarks.overlap_queries
+measures it on its own.
+
+    python -m benchmarks.query_plans [--rows 100000]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+from sqlalchemy import create_engine, delete, func, inspect, insert, select, text
+from database import migrations, times
+from database.serve_data import db, month_range, overlap_filter, InvolvementCenter
+from benchmarks import synthetic_events
+
+def during(table, first, end):
+    # serve_data.during, as a select
+    return select(table).filter(*overlap_filter(table, times.midnight(first), times.midnight(end))).order_by(table.startAt.asc())
+
+def endpoint_queries(table, day):
+    # Same filters and ordering as the resources in serve_data, with day's midnight standing in for now
+    return {
+        'list': select(table).order_by(table.startDate.asc()),
+        'daily': during(table, day, day + timedelta(days=1)),
+        'weekly': during(table, day, day + timedelta(days=7)),
+        'monthly': during(table, *month_range(day.strftime("%Y-%m"))),
+        'delete_past': delete(table).filter(table.endAt < times.midnight(day)),
+    }
+
+def compile_sql(connection, statement):
+    return str(statement.compile(connection, compile_kwargs={'literal_binds': True}))
+
+def report(connection, table, day, repeat):
+    for name, statement in endpoint_queries(table, day).items():
+        sql = compile_sql(connection, statement)
+        plan = [row[-1] for row in connection.execute(text("EXPLAIN QUERY PLAN " + sql))]
+        if name == 'delete_past':
+            # Time the lookup without actually deleting anything
+            sql = compile_sql(connection, select(func.count()).select_from(table).filter(table.endAt < times.midnight(day)))
+        begin = time.perf_counter()
+        for _ in range(repeat):
+            connection.execute(text(sql)).fetchall()
+        elapsed = (time.perf_counter() - begin) / repeat * 1000
+        print(f"  {name:<12} {elapsed:8.2f} ms   {' | '.join(plan)}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    random.seed(472)
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    table = InvolvementCenter
+    db.metadata.create_all(engine)
+    with engine.begin() as connection:
+        # Start from the schema as it was before the indexes existed
+        for index in inspect(connection).get_indexes(table.__tablename__):
+            connection.execute(text(f'DROP INDEX "{index["name"]}"'))
+        connection.execute(insert(table.__table__), list(synthetic_events(args.rows)))
+    day = date(2025, 3, 3)
+
+    with engine.connect() as connection:
+        print(f"Without indexes ({args.rows} rows)")
+        report(connection, table, day, args.repeat)
+    with engine.begin() as connection:
+        migrations.create_indexes(connection, db.metadata)
+        connection.execute(text("ANALYZE"))
+    with engine.connect() as connection:
+        print(f"\nWith indexes ({args.rows} rows)")
+        report(connection, table, day, args.repeat)
+    engine.dispose()
+    os.remove(path)
+
+if __name__ == '__main__':
+    main()
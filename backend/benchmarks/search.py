@@ -0,0 +1,92 @@
+"""
+Search over event names, locations and organizations: LIKE scans against FTS5
+
+Fills a throwaway SQLite database with synthetic Involvement Center events
+named from a few thousand made up words, and times searches as a LIKE
+'%word%' scan over the text columns against the involvement_center_search
+FTS5 index behind /events/search: finding every match, and the best
+--limit matches ranked by bm25. LIKE also matches inside words, FTS5 only
+at their start, so the counts can differ. Also times inserting the rows
+with and without the triggers that keep the index in step.
+
+    python -m benchmarks.search [--rows 200000]
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from sqlalchemy import create_engine, insert, or_, select, text
+from sqlalchemy.orm import Session
+from database import migrations
+from database.serve_data import db, InvolvementCenter, matching, search_query
+from benchmarks import synthetic_events
+
+SYLLABLES = "ba be bi bo ca ce co da de di fa fe ga go ka ki la le li lo ma me mi mo na ne no ra re ri ro sa se so ta te ti to va ve".split()
+
+def vocabulary(size):
+    words = set()
+    while len(words) < size:
+        words.add("".join(random.choices(SYLLABLES, k=random.randrange(2, 5))))
+    return sorted(words)
+
+def like(table, phrase):
+    # Every word somewhere in one of the text columns
+    conditions = [or_(*(getattr(table, column).ilike(f"%{word}%") for column in table.search_columns)) for word in phrase.split()]
+    return select(table).filter(*conditions)
+
+def timed(function, repeat):
+    begin = time.perf_counter()
+    for _ in range(repeat):
+        found = function()
+    return (time.perf_counter() - begin) / repeat * 1000, found
+
+def insert_seconds(engine, table, rows):
+    begin = time.perf_counter()
+    with engine.begin() as connection:
+        connection.execute(insert(table.__table__), rows)
+    return time.perf_counter() - begin
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--words", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    random.seed(472)
+    words = vocabulary(args.words)
+    rows = list(synthetic_events(args.rows, words=words))
+    table = InvolvementCenter
+    directory = tempfile.mkdtemp()
+
+    # The same rows without the search triggers, to see what keeping the index costs
+    plain = create_engine(f"sqlite:///{os.path.join(directory, 'plain.db')}")
+    db.metadata.create_all(plain)
+    with plain.begin() as connection:
+        migrations.drop_search_index(connection, table.__table__)
+    without = insert_seconds(plain, table, rows)
+    plain.dispose()
+
+    engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+    # create_all also builds the FTS5 index and its triggers
+    db.metadata.create_all(engine)
+    with_index = insert_seconds(engine, table, rows)
+    with engine.begin() as connection:
+        connection.execute(text("ANALYZE"))
+    print(f"{args.rows} events, {args.words} words: inserted in {without:.1f} s without the FTS5 triggers, {with_index:.1f} s with")
+
+    phrases = [words[100], f"{words[200]} {words[300]}", words[400][:4], f"beam {words[500]}"]
+    with Session(engine) as session:
+        for phrase in phrases:
+            like_ms, like_found = timed(lambda: len(session.execute(like(table, phrase)).all()), args.repeat)
+            all_ms, all_found = timed(lambda: len(session.execute(matching(table, search_query(phrase))).all()), args.repeat)
+            top_ms, _ = timed(lambda: session.execute(matching(table, search_query(phrase)).limit(args.limit)).all(), args.repeat)
+            print(f"  {phrase!r:<22} LIKE {like_ms:8.2f} ms ({like_found})   FTS5 {all_ms:6.2f} ms ({all_found}), top {args.limit} {top_ms:6.2f} ms")
+    engine.dispose()
+    shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Throughput of time normalization, database.times against the old format_time
+
+Draws a corpus of times in the formats the scrapers send and normalizes it
+with the character scanning format_time that serve_data used before, with
+database.times.parse_time uncached, and with its memoized form (the corpus
+repeats a few hundred distinct values, like a real scrape).
+
+    python -m benchmarks.time_formats [--samples 1000000]
+"""
+import argparse
+import random
+import time
+from database import times
+
+def legacy_format_time(base_time):
+    # format_time as it was in serve_data, kept here for comparison
+    if not base_time:
+        return ""
+    formatted_time = ""
+    colon_pos = 0
+    am_pm_pos = 0
+    base_time = base_time.upper()
+
+    all_char = True
+    for i in range(len(base_time)):
+        if base_time[i].isnumeric():
+            all_char = False
+    if all_char:
+        return base_time
+
+    colon_pos = base_time.find(":")
+
+    if colon_pos > 0:
+        if base_time[colon_pos + 2:].find(":") > 0:
+            if int(base_time[:colon_pos]) < 12:
+                formatted_time = base_time[:colon_pos + 3] + " AM"
+                if formatted_time[:2] == "00":
+                    formatted_time = "12" + formatted_time[2:]
+            else:
+                if int(base_time[:colon_pos]) > 12:
+                    pm_time = str(int(base_time[:colon_pos]) % 12)
+                else:
+                    pm_time = "12"
+                formatted_time = pm_time + base_time[colon_pos:colon_pos + 3]
+                formatted_time = formatted_time + " PM"
+            colon_pos = formatted_time.find(":")
+            formatted_time = str(int(formatted_time[:colon_pos])) + formatted_time[colon_pos:]
+            return formatted_time
+        formatted_time = base_time[:colon_pos + 3]
+        am_pm_pos = base_time.find("A")
+        if am_pm_pos > 0:
+            formatted_time = formatted_time + " AM"
+        am_pm_pos = base_time.find("P")
+        if am_pm_pos > 0:
+            formatted_time = formatted_time + " PM"
+        colon_pos = formatted_time.find(":")
+        formatted_time = str(int(formatted_time[:colon_pos])) + formatted_time[colon_pos:]
+        return formatted_time
+
+    if colon_pos == -1:
+        for i in range(len(base_time)):
+            if not base_time[i].isnumeric():
+                formatted_time = base_time[:i] + ":00"
+                break
+        for i in range(len(base_time)):
+            is_alpha = base_time[i].isalpha()
+            if is_alpha:
+                if base_time[i] == "A":
+                    formatted_time = formatted_time + " AM"
+                if base_time[i] == "P":
+                    formatted_time = formatted_time + " PM"
+                break
+        colon_pos = formatted_time.find(":")
+        formatted_time = str(int(formatted_time[:colon_pos])) + formatted_time[colon_pos:]
+        return formatted_time
+
+def corpus(samples):
+    # Formats seen from the Involvement Center, UNLV calendar and Rebel Coverage
+    formats = [
+        lambda h, m: f"{h % 12 or 12}:{m:02d} {'pm' if h >= 12 else 'am'}",
+        lambda h, m: f"{h % 12 or 12}:{m:02d} {'PM' if h >= 12 else 'AM'}",
+        lambda h, m: f"{h:02d}:{m:02d}:00",
+        lambda h, m: f"{h % 12 or 12}{'PM' if h >= 12 else 'AM'}",
+        lambda h, m: f"{h % 12 or 12} {'p.m.' if h >= 12 else 'a.m.'}",
+        lambda h, m: "All Day",
+        lambda h, m: "TBA",
+    ]
+    return [random.choice(formats)(random.randrange(24), random.choice((0, 15, 30, 45))) for _ in range(samples)]
+
+def timed(function, values):
+    begin = time.perf_counter()
+    for value in values:
+        function(value)
+    return time.perf_counter() - begin
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    random.seed(472)
+    values = corpus(args.samples)
+    uncached = times.parse_time.__wrapped__
+    print(f"{args.samples} samples, {len(set(values))} distinct")
+    for name, function in (("format_time (old)", legacy_format_time),
+                           ("parse_time, uncached", uncached),
+                           ("parse_time, memoized", times.parse_time)):
+        times.parse_time.cache_clear()
+        elapsed = timed(function, values)
+        print(f"  {name:<22} {elapsed:6.2f} s  {args.samples / elapsed / 1e6:6.2f} M/s")
+    print(f"  {times.parse_time.cache_info()}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Latency of the /events/upcoming query on a large synthetic history
+
+Fills a throwaway SQLite database with events spread over the four event
+tables and three years, a few of them lasting several days, then times the
+query behind /events/upcoming for a two hour window: the plain overlap
+test (startAt < end AND endAt > start) against the span R*Tree lookup from
+serve_data.overlap_filter, and the whole answer including marshalling.
+
+    python -m benchmarks.upcoming_events [--rows 200000]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from flask_restful import marshal
+from sqlalchemy import create_engine, insert, select, text
+from sqlalchemy.orm import Session
+from database import migrations
+from database.serve_data import db, bulk_tables, event_tables, overlap_filter
+from benchmarks import synthetic_events
+
+def timed(function, repeat):
+    begin = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - begin) / repeat * 1000, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--hours", type=float, default=2)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    random.seed(472)
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    db.metadata.create_all(engine)
+    tables = [bulk_tables[name] for name in event_tables]
+    with engine.begin() as connection:
+        for table, _, _ in tables:
+            connection.execute(insert(table.__table__), list(synthetic_events(args.rows // len(tables), long_share=0.02, long_days=10, columns=table.__table__.c.keys())))
+        migrations.create_indexes(connection, db.metadata)
+        connection.execute(text("ANALYZE"))
+
+    start = datetime(2025, 3, 4, 2, 0, tzinfo=timezone.utc)
+    end = start + timedelta(hours=args.hours)
+    with Session(engine) as session:
+        def plain():
+            return [session.scalars(select(table).filter(table.startAt < end, table.endAt > start)).all() for table, _, _ in tables]
+
+        def indexed():
+            return [session.scalars(select(table).filter(*overlap_filter(table, start, end))).all() for table, _, _ in tables]
+
+        def endpoint():
+            events = []
+            for name, (table, _, table_fields) in zip(event_tables, tables):
+                statement = select(table).filter(*overlap_filter(table, start, end)).order_by(table.startAt)
+                events += [(event.startAt, name, event, table_fields) for event in session.scalars(statement)]
+            events.sort(key=lambda item: item[:2])
+            return [dict(marshal(event, table_fields), source=name) for _, name, event, table_fields in events]
+
+        print(f"{args.rows} events, {args.hours:g} hour window")
+        for name, function in (("plain overlap", plain), ("R*Tree overlap", indexed), ("whole answer", endpoint)):
+            session.expunge_all()
+            elapsed, result = timed(function, args.repeat)
+            found = len(result) if name == "whole answer" else sum(len(rows) for rows in result)
+            print(f"  {name:<16} {elapsed:8.2f} ms   {found} events")
+    engine.dispose()
+    os.remove(path)
+
+if __name__ == '__main__':
+    main()
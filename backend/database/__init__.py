@@ -1,4 +1,36 @@
+import sys
+from webscraping.session import session
+
 # Flask API
 # Swap BASE comments if you want to use a local host (127.0.0.1) or persistant web host
 BASE = "http://localhost:5050/"
 #BASE = "http://franklopez.tech:5050/"
+
+def ingest(table, rows, upsert=False):
+    """
+    Add a batch of rows to a table, e.g. ingest("involvementcenter", events), and return the bulk add report.
+    With upsert, rows already stored are updated in place when they changed instead of counted as duplicates.
+    When the API runs in this process (a scrape started by /scrape_all) the rows go straight into
+    the database, otherwise they are sent to the API at BASE.
+    """
+    serve_data = sys.modules.get('database.serve_data')
+    if serve_data is None:
+        return session.put(BASE + f"{table}_bulk_{'upsert' if upsert else 'add'}", json=rows).json()
+    model, parser, _ = serve_data.bulk_tables[table]
+    with serve_data.app.app_context():
+        if upsert:
+            return serve_data.upsert(model, parser, rows)
+        return serve_data.bulk_add(model, parser, rows)
+
+def rows(table):
+    """
+    All rows of a table as dicts, read in-process when the API runs here, otherwise from the API at BASE.
+    """
+    serve_data = sys.modules.get('database.serve_data')
+    if serve_data is None:
+        response = session.get(BASE + f"{table}_list")
+        # The list endpoints answer 404 for an empty table
+        return response.json() if response.status_code == 200 else []
+    model, _, fields = serve_data.bulk_tables[table]
+    with serve_data.app.app_context():
+        return serve_data.marshal(model.query.all(), fields)
@@ -0,0 +1,101 @@
+"""
+Table versions and response caching for GET endpoints
+
+Every table carries a version counter that is bumped whenever an endpoint
+adds or deletes rows, so GET endpoints can build an ETag and Last-Modified
+from memory and answer If-None-Match without querying the database.
+Serialized responses are kept in an LRU cache that is dropped per table
+on the same bumps.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+class TableVersions:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = {}
+        # Tags from an earlier run of the server must never match this one
+        self._run = uuid.uuid4().hex[:8]
+        # Rows may have changed while the server was down
+        self._started = self._clock = int(time.time())
+
+    def bump(self, *tables):
+        # Times are whole seconds, like Last-Modified, and every change gets a later one than
+        # any table had before, so a date a client holds never also covers a newer version
+        with self._lock:
+            self._clock = max(int(time.time()), self._clock + 1)
+            for table in tables:
+                version, _ = self._versions.get(table, (0, self._started))
+                self._versions[table] = (version + 1, self._clock)
+
+    def version(self, table):
+        with self._lock:
+            return self._versions.get(table, (0, self._started))
+
+    def etag(self, tables):
+        # e.g. 3f2a9c1d-academic_calendar.4-involvement_center.12
+        parts = [f"{table}.{self.version(table)[0]}" for table in sorted(tables)]
+        return "-".join([self._run] + parts)
+
+    def last_modified(self, tables):
+        return max(self.version(table)[1] for table in tables)
+
+class ResponseCache:
+    """
+    LRU cache of serialized response bodies, keyed by path and query string.
+    Entries expire after ttl seconds and are dropped when one of their tables changes.
+    """
+    def __init__(self, max_entries=512, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key, etag):
+        # Only a body built for the current table versions counts as a hit
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry['etag'] == etag and entry['expires'] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry['body'], entry['status']
+            if entry:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, etag, tables, body, status):
+        with self._lock:
+            self._entries[key] = {
+                'etag': etag,
+                'tables': set(tables),
+                'body': body,
+                'status': status,
+                'expires': time.monotonic() + self.ttl
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *tables):
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry['tables'] & set(tables)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl
+            }
@@ -0,0 +1,59 @@
+"""
+Set-based duplicate detection for event ingest
+
+Each model lists its natural key columns in `natural_key` and backs them
+with a unique index, so a batch is checked against the table in one query
+and the database still drops anything that slips through.
+"""
+from sqlalchemy.dialects.sqlite import insert
+
+def row_key(table, values):
+    # Natural key of a row given as a dict of column values
+    return tuple(values.get(col) for col in table.natural_key)
+
+def existing_keys(session, table, keys):
+    """
+    Find which of the given natural keys are already stored.
+    Returns a dict of key -> row id, loaded with a single query.
+    """
+    if not keys:
+        return {}
+    columns = [getattr(table, col) for col in table.natural_key]
+    query = session.query(table.id, *columns)
+    if 'startDate' in table.natural_key:
+        # Load every key in the batch's date range and match them in memory
+        position = table.natural_key.index('startDate')
+        dates = [key[position] for key in keys]
+        query = query.filter(table.startDate.between(min(dates), max(dates)))
+    else:
+        query = query.filter(columns[0].in_({key[0] for key in keys}))
+    wanted = set(keys)
+    found = {}
+    for row in query:
+        key = tuple(row[1:])
+        if key in wanted:
+            found[key] = row[0]
+    return found
+
+def source_key(table, values):
+    # Source key of a row given as a dict of column values, source_id first
+    return tuple(values.get(col) for col in table.source_key)
+
+def existing_sources(session, table, keys):
+    # Stored rows with the given source keys, as a dict of key -> row
+    found = {}
+    keys = set(keys)
+    source_ids = sorted({key[0] for key in keys})
+    # Stay well under SQLite's limit on bound parameters
+    for start in range(0, len(source_ids), 500):
+        chunk = source_ids[start:start + 500]
+        for row in session.query(table).filter(table.source_id.in_(chunk)):
+            key = source_key(table, vars(row))
+            if key in keys:
+                found[key] = row
+    return found
+
+def insert_new(session, table, rows):
+    # INSERT ... ON CONFLICT DO NOTHING, the unique index is the final word on duplicates
+    if rows:
+        session.execute(insert(table.__table__).on_conflict_do_nothing(), rows)
@@ -0,0 +1,199 @@
+"""
+Schema upgrades for databases created by an older serve_data
+
+db.create_all() only creates missing tables, so anything added to an
+existing table (indexes, columns) is brought in here.
+
+Every event table also has an R*Tree, <table>_span, of its events'
+[startAt, endAt] in whole minutes since the epoch, kept in step by
+triggers. The range endpoints find overlapping events through it.
+Tables with search_columns get an FTS5 index, <table>_search, over those
+columns in the same way.
+"""
+from sqlalchemy import bindparam, inspect, select, text
+from database import times
+
+def add_columns(connection, metadata):
+    # SQLite can add a nullable column in place, which is all the models ever add
+    for table in metadata.sorted_tables:
+        existing = {column['name'] for column in inspect(connection).get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            kind = column.type.compile(dialect=connection.dialect)
+            connection.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {kind}'))
+
+def normalize_times(connection, metadata):
+    """
+    Rewrite startTime / endTime values stored before times.display_time, such
+    as "10:00", "17:15" or "NOON", the way it stores them now. Their startAt /
+    endAt are cleared for fill_times to work out again, and unique indexes over
+    the times are dropped for create_indexes to rebuild without the duplicates
+    this can make.
+    """
+    for table in metadata.sorted_tables:
+        if 'startTime' not in table.c:
+            continue
+        columns = table.c
+        rewritten = False
+        for name in ('startTime', 'endTime'):
+            column = columns[name]
+            stored = connection.execute(select(column).distinct().where(column.isnot(None))).scalars()
+            changes = [{'old': value, 'new': times.display_time(value)} for value in stored]
+            changes = [change for change in changes if change['new'] != change['old']]
+            if not changes:
+                continue
+            if not rewritten:
+                for index in table.indexes:
+                    if index.unique and {'startTime', 'endTime'} & {column.name for column in index.columns}:
+                        connection.execute(text(f'DROP INDEX IF EXISTS "{index.name}"'))
+                rewritten = True
+            values = {name: bindparam('new')}
+            if 'startAt' in columns:
+                values.update(startAt=None, endAt=None)
+            connection.execute(table.update().where(column == bindparam('old')).values(values), changes)
+
+def fill_times(connection, metadata):
+    # startAt / endAt of event rows stored before the columns existed
+    for table in metadata.sorted_tables:
+        if 'startAt' not in table.c:
+            continue
+        columns = table.c
+        rows = connection.execute(
+            select(columns.id, columns.startDate, columns.startTime, columns.endDate, columns.endTime)
+            .where(columns.startAt.is_(None))
+        ).all()
+        spans = []
+        for row in rows:
+            start_at, end_at = times.event_span(row.startDate, row.startTime, row.endDate, row.endTime)
+            spans.append({'row_id': row.id, 'start_at': start_at, 'end_at': end_at})
+        if spans:
+            connection.execute(
+                table.update().where(columns.id == bindparam('row_id'))
+                .values(startAt=bindparam('start_at'), endAt=bindparam('end_at')),
+                spans
+            )
+
+def drop_duplicates(connection, index):
+    # Keep the oldest row of every group a new unique index would reject, or the newest
+    # for indexes declared with info={'keep': 'newest'}
+    table = index.table.name
+    keep = "MAX" if index.info.get('keep') == 'newest' else "MIN"
+    columns = ", ".join(f'"{column.name}"' for column in index.columns)
+    # Partial indexes only cover the rows matching their WHERE clause
+    where = index.dialect_options['sqlite']['where']
+    condition = f"{where} AND " if where is not None else ""
+    subquery_condition = f" WHERE {where}" if where is not None else ""
+    connection.execute(text(
+        f'DELETE FROM "{table}" WHERE {condition}id NOT IN '
+        f'(SELECT {keep}(id) FROM "{table}"{subquery_condition} GROUP BY {columns})'
+    ))
+
+def drop_retired_indexes(connection, metadata):
+    # Indexes an older serve_data created that the models no longer declare
+    for table in metadata.sorted_tables:
+        declared = {index.name for index in table.indexes}
+        for index in inspect(connection).get_indexes(table.name):
+            if index['name'].startswith(('ix_', 'uq_')) and index['name'] not in declared:
+                connection.execute(text(f'DROP INDEX "{index["name"]}"'))
+
+def create_indexes(connection, metadata):
+    for table in metadata.sorted_tables:
+        existing = {index['name'] for index in inspect(connection).get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            if index.unique:
+                drop_duplicates(connection, index)
+            index.create(connection)
+
+def minute(value, round_up=False):
+    # Minutes since the epoch of a stored UTC datetime, as SQL
+    seconds = f"CAST(strftime('%s', {value}) AS INTEGER)"
+    return f"({seconds} + 59) / 60" if round_up else f"{seconds} / 60"
+
+def span_values(row):
+    # id, startMinute, endMinute of a row; an R*Tree rejects a start after the end
+    start = minute(f'{row}"startAt"')
+    end = minute(f'{row}"endAt"', round_up=True)
+    return f"{row}id, {start}, max({start}, coalesce({end}, {start}))"
+
+def create_span_index(connection, table):
+    """R*Tree and triggers for one event table, filled from the rows already there."""
+    name = table.name
+    span = f'"{name}_span"'
+    existed = inspect(connection).has_table(f"{name}_span")
+    for statement in (
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {span} USING rtree_i32(id, "startMinute", "endMinute")',
+        f'CREATE TRIGGER IF NOT EXISTS "{name}_span_insert" AFTER INSERT ON "{name}" '
+        f'WHEN new."startAt" IS NOT NULL BEGIN '
+        f'INSERT INTO {span} VALUES ({span_values("new.")}); END',
+        f'CREATE TRIGGER IF NOT EXISTS "{name}_span_update" AFTER UPDATE OF "startAt", "endAt" ON "{name}" BEGIN '
+        f'DELETE FROM {span} WHERE id = old.id; '
+        f'INSERT INTO {span} SELECT {span_values("new.")} WHERE new."startAt" IS NOT NULL; END',
+        f'CREATE TRIGGER IF NOT EXISTS "{name}_span_delete" AFTER DELETE ON "{name}" BEGIN '
+        f'DELETE FROM {span} WHERE id = old.id; END',
+    ):
+        connection.execute(text(statement))
+    if not existed:
+        connection.execute(text(f'INSERT INTO {span} SELECT {span_values("")} FROM "{name}" WHERE "startAt" IS NOT NULL'))
+
+def drop_span_index(connection, table):
+    for trigger in ('insert', 'update', 'delete'):
+        connection.execute(text(f'DROP TRIGGER IF EXISTS "{table.name}_span_{trigger}"'))
+    connection.execute(text(f'DROP TABLE IF EXISTS "{table.name}_span"'))
+
+def create_span_indexes(connection, metadata):
+    for table in metadata.sorted_tables:
+        if 'startAt' in table.c:
+            create_span_index(connection, table)
+
+def create_search_index(connection, table, columns):
+    """
+    External content FTS5 index over the given text columns of a table, with
+    prefix indexes for search as you type, filled from the rows already there.
+    Matches in the first column (the name) weigh ten times the others.
+    """
+    name = table.name
+    search = f'"{name}_search"'
+    existed = inspect(connection).has_table(f"{name}_search")
+    names = ", ".join(f'"{column}"' for column in columns)
+    new = ", ".join(f'new."{column}"' for column in columns)
+    old = ", ".join(f'old."{column}"' for column in columns)
+    for statement in (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {search} USING fts5({names}, content='{name}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f'CREATE TRIGGER IF NOT EXISTS "{name}_search_insert" AFTER INSERT ON "{name}" BEGIN '
+        f'INSERT INTO {search} (rowid, {names}) VALUES (new.id, {new}); END',
+        f'CREATE TRIGGER IF NOT EXISTS "{name}_search_update" AFTER UPDATE ON "{name}" BEGIN '
+        f"INSERT INTO {search} ({search}, rowid, {names}) VALUES ('delete', old.id, {old}); "
+        f'INSERT INTO {search} (rowid, {names}) VALUES (new.id, {new}); END',
+        f'CREATE TRIGGER IF NOT EXISTS "{name}_search_delete" AFTER DELETE ON "{name}" BEGIN '
+        f"INSERT INTO {search} ({search}, rowid, {names}) VALUES ('delete', old.id, {old}); END",
+    ):
+        connection.execute(text(statement))
+    if not existed:
+        weights = ", ".join(["10.0"] + ["1.0"] * (len(columns) - 1))
+        connection.execute(text(f"INSERT INTO {search} ({search}, rank) VALUES ('rank', 'bm25({weights})')"))
+        connection.execute(text(f"INSERT INTO {search} ({search}) VALUES ('rebuild')"))
+
+def drop_search_index(connection, table):
+    for trigger in ('insert', 'update', 'delete'):
+        connection.execute(text(f'DROP TRIGGER IF EXISTS "{table.name}_search_{trigger}"'))
+    connection.execute(text(f'DROP TABLE IF EXISTS "{table.name}_search"'))
+
+def create_search_indexes(connection, models):
+    for model in models:
+        if getattr(model, 'search_columns', None):
+            create_search_index(connection, model.__table__, model.search_columns)
+
+def upgrade(db):
+    """Bring the tables behind db up to date with the models."""
+    with db.engine.begin() as connection:
+        add_columns(connection, db.metadata)
+        normalize_times(connection, db.metadata)
+        fill_times(connection, db.metadata)
+        drop_retired_indexes(connection, db.metadata)
+        create_indexes(connection, db.metadata)
+        create_span_indexes(connection, db.metadata)
+        create_search_indexes(connection, [mapper.class_ for mapper in db.Model.registry.mappers])
@@ -1,131 +1,198 @@
 """
 User and Events API Implementation
 """
-from flask import Flask, jsonify, make_response
+import base64
+import json
+import re
+import sqlite3
+from flask import Flask, Response, jsonify, make_response, request, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
-from flask_restful import Api, Resource, reqparse, abort, fields, marshal_with
+from flask_restful import Api, Resource, reqparse, abort, fields, marshal, marshal_with
+from flask_restful.utils import unpack
 from http import HTTPStatus
-from datetime import datetime, timedelta
-from sqlalchemy import func, and_
-from webscraping import academic_calendar, involvement_center, rebel_coverage, organizations # , unlv_calendar
+from werkzeug.http import http_date, quote_etag
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy import column, insert, select, table as sql_table, tuple_
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from functools import wraps
+from urllib.parse import urlencode
+from database.dedup import row_key, source_key, existing_keys, existing_sources, insert_new
+from database import migrations, times
+from database.cache import TableVersions, ResponseCache
+from webscraping import orchestrator
 
 app = Flask(__name__)
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///database.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 api = Api(app)
 db = SQLAlchemy(app)
+table_versions = TableVersions()
+response_cache = ResponseCache(max_entries=512, ttl=300)
+
+# pysqlite only opens a transaction before an INSERT/UPDATE/DELETE, so a SAVEPOINT sent
+# first is the outermost one and its RELEASE commits. Let SQLAlchemy send BEGIN instead,
+# as its SQLite docs recommend, so savepoints nest inside one transaction.
+@db.event.listens_for(Engine, 'connect')
+def sqlite_connect(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.isolation_level = None
+
+@db.event.listens_for(Engine, 'begin')
+def sqlite_begin(connection):
+    if connection.dialect.name == 'sqlite':
+        connection.exec_driver_sql("BEGIN")
+
+def touch(*tables):
+    # Call after committing a change to these tables
+    names = [table.__tablename__ for table in tables]
+    table_versions.bump(*names)
+    response_cache.invalidate(*names)
+
+def conditional(*tables):
+    """
+    Give a GET resource ETag and Last-Modified headers built from the table
+    versions, and answer If-None-Match / If-Modified-Since with 304 without
+    running it. Other requests are served from the response cache when the
+    same URL was already built for the current versions.
+    """
+    names = [table.__tablename__ for table in tables]
+    def decorator(get):
+        @wraps(get)
+        def wrapper(*args, **kwargs):
+            etag = table_versions.etag(names)
+            modified = datetime.fromtimestamp(table_versions.last_modified(names), timezone.utc)
+            headers = {'ETag': quote_etag(etag), 'Last-Modified': http_date(modified)}
+            # The ETag decides when there is one
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                # Version times are distinct whole seconds, see TableVersions.bump
+                not_modified = request.if_modified_since is not None and modified <= request.if_modified_since
+            if not_modified:
+                return make_response('', HTTPStatus.NOT_MODIFIED, headers)
+            key = request.path + '?' + urlencode(sorted(request.args.items(multi=True)))
+            cached = response_cache.get(key, etag)
+            if cached:
+                body, status = cached
+                return app.response_class(body, status, headers, mimetype='application/json')
+            data, code, extra = unpack(get(*args, **kwargs))
+            response = api.make_response(data, code, headers={**headers, **(extra or {})})
+            if response.status_code == HTTPStatus.OK:
+                response_cache.put(key, etag, names, response.get_data(), response.status_code)
+            return response
+        return wrapper
+    return decorator
 
 def format_time(base_time):
-    if not base_time:
-        return ""
-    formatted_time = ""
-    colon_pos = 0
-    am_pm_pos = 0
-    base_time = base_time.upper()
-
-    # for (All Day), TBA, or non time
-    all_char = True
-    for i in range(len(base_time)):
-        if base_time[i].isnumeric():
-            all_char = False
-    if all_char:
-        return base_time
-    
-    colon_pos = base_time.find(":")
-
-    # for 8:30 pm and 17:15:00 military time formats
-    if colon_pos > 0:
-        # for military format
-        if base_time[colon_pos + 2:].find(":") > 0:
-            if int(base_time[:colon_pos]) < 12:
-                formatted_time = base_time[:colon_pos + 3] + " AM"
-                # midnight
-                if formatted_time[:2] == "00":
-                    formatted_time = "12" + formatted_time[2:]
-            else:
-                if int(base_time[:colon_pos]) > 12:
-                    pm_time = str(int(base_time[:colon_pos]) % 12)
-                else:
-                    pm_time = "12"
-                formatted_time = pm_time + base_time[colon_pos:colon_pos + 3]
-                formatted_time = formatted_time + " PM"
-            colon_pos = formatted_time.find(":")
-            formatted_time = str(int(formatted_time[:colon_pos])) + formatted_time[colon_pos:]
-            return formatted_time
-        # for 8:30 pm format
-        formatted_time = base_time[:colon_pos + 3]
-        am_pm_pos = base_time.find("A")
-        if am_pm_pos > 0:
-            formatted_time = formatted_time + " AM"
-        am_pm_pos = base_time.find("P")
-        if am_pm_pos > 0:
-            formatted_time = formatted_time + " PM"
-        colon_pos = formatted_time.find(":")
-        formatted_time = str(int(formatted_time[:colon_pos])) + formatted_time[colon_pos:]
-        return formatted_time
-    
-    # for 11 am format
-    if colon_pos == -1:
-        for i in range(len(base_time)):
-            if not base_time[i].isnumeric():
-                formatted_time = base_time[:i] + ":00"
-                break   
-        for i in range(len(base_time)):
-            is_alpha = base_time[i].isalpha()
-            if is_alpha:
-                if base_time[i] == "A":
-                    formatted_time = formatted_time + " AM"
-                if base_time[i] == "P":
-                    formatted_time = formatted_time + " PM"
-                break
-        colon_pos = formatted_time.find(":")
-        formatted_time = str(int(formatted_time[:colon_pos])) + formatted_time[colon_pos:]
-        return formatted_time
+    # Display form of a scraped time, e.g. "17:15:00" -> "5:15 PM", see database.times
+    return times.display_time(base_time)
 
-def DupCheck(table, startDate, endDate, name, startTime = ''):
-    if startTime:
-        startTime = format_time(startTime)
-    # Academic Calendar
-    if table == AcademicCalendar:
-        # Format date from string into date object
+def parse_dates(table, startDate, endDate):
+    # Academic Calendar and UNLV Calendar
+    if table in (AcademicCalendar, UNLVCalendar):
         fmt='%A, %B %d, %Y'
-        start_date = datetime.strptime(startDate, fmt)
-        end_date = datetime.strptime(endDate, fmt)
-        # Check if event exists already
-        result = db.session.query(table).filter(and_(table.startDate == func.date(start_date), table.name == name)).all()
-
-    # Involvement Center
-    if table == InvolvementCenter:
-        # Format date from string into date object
-        start_date = datetime.fromisoformat(startDate)
-        end_date = datetime.fromisoformat(endDate)
-        # Check if event exists already
-        result = db.session.query(table).filter(and_(table.startDate == func.date(start_date), table.name == name, table.startTime == startTime)).all()
-
+    # Involvement Center sends ISO dates
+    elif table == InvolvementCenter:
+        return datetime.fromisoformat(startDate).date(), datetime.fromisoformat(endDate).date()
     # Rebel Coverage
-    if table == RebelCoverage:
-        # Format date from string into date object
+    elif table == RebelCoverage:
         fmt="%m/%d/%Y"
-        # Convert string to datetime object
-        start_date = datetime.strptime(startDate, fmt)
-        end_date = datetime.strptime(endDate, fmt)
-        # Check if event exists already
-        result = db.session.query(table).filter(and_(table.startDate == func.date(start_date), table.name == name, table.startTime == startTime)).all()
-
-    # UNLV Calendar
-    if table == UNLVCalendar:
-        # Format date from string into date object
-        fmt='%A, %B %d, %Y'
-        start_date = datetime.strptime(startDate, fmt)
-        end_date = datetime.strptime(endDate, fmt)
-        # Check if event exists already
-        result = db.session.query(table).filter(and_(table.startDate == func.date(start_date), table.name == name, table.startTime == startTime)).all()
+    return datetime.strptime(startDate, fmt).date(), datetime.strptime(endDate, fmt).date()
+
+def month_range(month):
+    # Half-open [first of month, first of next month) range for a YYYY-MM string
+    first = datetime.strptime(month, "%Y-%m").date()
+    if first.month == 12:
+        return first, first.replace(year=first.year + 1, month=1)
+    return first, first.replace(month=first.month + 1)
+
+def view_range(viewMode, date):
+    # Half-open date range covered by a daily, weekly or monthly view starting at date
+    if viewMode == 'monthly':
+        return month_range(date[:7])
+    start_date = datetime.strptime(date, "%Y-%m-%d").date()
+    if viewMode == 'daily':
+        return start_date, start_date + timedelta(days=1)
+    if viewMode == 'weekly':
+        return start_date, start_date + timedelta(days=7)
+    raise ValueError(f"Unknown view mode '{viewMode}'")
+
+def utc_now():
+    return datetime.now(timezone.utc)
 
+def DupCheck(table, startDate, endDate, name, startTime = ''):
+    # Format dates from strings into date objects
+    start_date, end_date = parse_dates(table, startDate, endDate)
     # Check if event exists already
-    if result:
+    key = row_key(table, {'name': name, 'startDate': start_date, 'startTime': format_time(startTime)})
+    if existing_keys(db.session, table, [key]):
         return False, False
     return start_date, end_date
 
+def event_values(table, args, start_date, end_date):
+    # Academic Calendar keeps its times as given, the other tables are formatted
+    if table == AcademicCalendar:
+        start_time, end_time = args.get('startTime'), args.get('endTime')
+    else:
+        start_time, end_time = format_time(args.get('startTime')), format_time(args.get('endTime'))
+    start_at, end_at = times.event_span(start_date, start_time, end_date, end_time)
+    values = {
+        'name': args['name'],
+        'startDate': start_date,
+        'startTime': start_time,
+        'endDate': end_date,
+        'endTime': end_time,
+        'startAt': start_at,
+        'endAt': end_at
+    }
+    # Copy over the extra columns this table has (location, organization, ...)
+    values.update({col: args.get(col) for col in ('location', 'organization', 'sport', 'category', 'link', 'source_id') if hasattr(table, col)})
+    return values
+
+def new_event(table, args, start_date, end_date):
+    return table(**event_values(table, args, start_date, end_date))
+
+def span_default(position):
+    # startAt / endAt of rows added without event_values, e.g. straight through the ORM
+    def default(context):
+        row = context.get_current_parameters()
+        return times.event_span(row['startDate'], row.get('startTime'), row.get('endDate'), row.get('endTime'))[position]
+    return default
+
+def span(table):
+    # The table's R*Tree of [startAt, endAt] in minutes, see migrations.create_span_index
+    return sql_table(f"{table.__tablename__}_span", column('id'), column('startMinute'), column('endMinute'))
+
+def overlap_filter(table, start, end):
+    """
+    Conditions for events running at some point in [start, end).
+    The span R*Tree narrows the table down to events overlapping the window
+    to the minute, startAt and endAt then decide exactly.
+    """
+    index = span(table)
+    candidates = select(index.c.id).where(
+        index.c.startMinute <= times.epoch_minute(end),
+        index.c.endMinute >= times.epoch_minute(start)
+    )
+    return (
+        table.id.in_(candidates),
+        table.startAt < end,
+        table.endAt > start
+    )
+
+def overlapping(table, start, end):
+    # Events running at some point in [start, end), in start order
+    return table.query.filter(*overlap_filter(table, start, end)).order_by(table.startAt.asc())
+
+def during(table, start_date, end_date):
+    # Events running on any of the local dates [start_date, end_date), in start order
+    return overlapping(table, times.midnight(start_date), times.midnight(end_date))
+
+def ended(table):
+    # Events over by now, multi-day events that started earlier and are still running stay
+    return table.endAt < utc_now()
+
 # Create User table for database
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -142,12 +209,28 @@ class User(db.Model):
 
 # Create Academic Calendar table for database
 class AcademicCalendar(db.Model):
+    # Columns that identify a duplicate event, enforced by a unique index
+    natural_key = ('name', 'startDate')
+    # Text columns behind /events/search, kept in an FTS5 index
+    search_columns = ('name',)
+    __table_args__ = (
+        db.Index('uq_academic_calendar_natural_key', *natural_key, unique=True),
+        # Daily/weekly/monthly ranges go by startAt
+        db.Index('ix_academic_calendar_start_at', 'startAt'),
+        # Past deletes go by endAt
+        db.Index('ix_academic_calendar_end_at', 'endAt'),
+        # Lists and their keyset pages go by (startDate, id)
+        db.Index('ix_academic_calendar_start_id', 'startDate', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(500), nullable=False)
     startDate = db.Column(db.Date, nullable=False)
     startTime = db.Column(db.String(100))
     endDate = db.Column(db.Date, nullable=False)
     endTime = db.Column(db.String(100))
+    # UTC start and end, see database.times.event_span
+    startAt = db.Column(times.UTCDateTime, default=span_default(0))
+    endAt = db.Column(times.UTCDateTime, default=span_default(1))
 
     def __repr__(self):
         return ("AcademicCalendar(" +
@@ -160,15 +243,34 @@ class AcademicCalendar(db.Model):
 
 # Create Involvement Center table for database
 class InvolvementCenter(db.Model):
+    natural_key = ('name', 'startDate', 'startTime')
+    # Columns that identify an event at its source, see database.dedup.source_key.
+    # An Involvement Center id is one occurrence, so a rescheduled event keeps it
+    source_key = ('source_id',)
+    search_columns = ('name', 'location', 'organization')
+    __table_args__ = (
+        db.Index('uq_involvement_center_natural_key', *natural_key, unique=True),
+        db.Index('ix_involvement_center_start_at', 'startAt'),
+        db.Index('ix_involvement_center_end_at', 'endAt'),
+        db.Index('ix_involvement_center_start_id', 'startDate', 'id'),
+        db.Index('ix_involvement_center_organization', 'organization', 'startDate'),
+        # The newest row wins when an upgrade finds a source id stored twice
+        db.Index('uq_involvement_center_source_id', *source_key, unique=True, sqlite_where=db.text('source_id IS NOT NULL'), info={'keep': 'newest'}),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(500), nullable=False)
     startDate = db.Column(db.Date, nullable=False)
     startTime = db.Column(db.String(100))
     endDate = db.Column(db.Date, nullable=False)
     endTime = db.Column(db.String(100))
+    # UTC start and end, see database.times.event_span
+    startAt = db.Column(times.UTCDateTime, default=span_default(0))
+    endAt = db.Column(times.UTCDateTime, default=span_default(1))
     location = db.Column(db.String(100))
     organization = db.Column(db.String(100))
     link = db.Column(db.String(100))
+    # Event id on the Involvement Center
+    source_id = db.Column(db.String(200))
 
     def __repr__(self):
         return ("InvolvementCenter(" +
@@ -184,15 +286,32 @@ class InvolvementCenter(db.Model):
     
 # Create Rebel Coverage table for database
 class RebelCoverage(db.Model):
+    natural_key = ('name', 'startDate', 'startTime')
+    # Every game has its own page
+    source_key = ('source_id',)
+    search_columns = ('name', 'location', 'sport')
+    __table_args__ = (
+        db.Index('uq_rebel_coverage_natural_key', *natural_key, unique=True),
+        db.Index('ix_rebel_coverage_start_at', 'startAt'),
+        db.Index('ix_rebel_coverage_end_at', 'endAt'),
+        db.Index('ix_rebel_coverage_start_id', 'startDate', 'id'),
+        db.Index('ix_rebel_coverage_sport', 'sport', 'startDate'),
+        db.Index('uq_rebel_coverage_source_id', *source_key, unique=True, sqlite_where=db.text('source_id IS NOT NULL'), info={'keep': 'newest'}),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(500), nullable=False)
     startDate = db.Column(db.Date, nullable=False)
     startTime = db.Column(db.String(100))
     endDate = db.Column(db.Date, nullable=False)
     endTime = db.Column(db.String(100))
+    # UTC start and end, see database.times.event_span
+    startAt = db.Column(times.UTCDateTime, default=span_default(0))
+    endAt = db.Column(times.UTCDateTime, default=span_default(1))
     location = db.Column(db.String(100))
     sport = db.Column(db.String(100))
     link = db.Column(db.String(100))
+    # Coverage link, when the listing has one
+    source_id = db.Column(db.String(200))
 
     def __repr__(self):
         return ("RebelCoverage(" +
@@ -208,15 +327,32 @@ class RebelCoverage(db.Model):
 
 # Create UNLV Calendar table for database
 class UNLVCalendar(db.Model):
+    natural_key = ('name', 'startDate', 'startTime')
+    # Recurring events link every date to the same event page, so the link is only unique per date
+    source_key = ('source_id', 'startDate')
+    search_columns = ('name', 'location', 'category')
+    __table_args__ = (
+        db.Index('uq_unlv_calendar_natural_key', *natural_key, unique=True),
+        db.Index('ix_unlv_calendar_start_at', 'startAt'),
+        db.Index('ix_unlv_calendar_end_at', 'endAt'),
+        db.Index('ix_unlv_calendar_start_id', 'startDate', 'id'),
+        db.Index('ix_unlv_calendar_category', 'category', 'startDate'),
+        db.Index('uq_unlv_calendar_source_start', *source_key, unique=True, sqlite_where=db.text('source_id IS NOT NULL')),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(500), nullable=False)
     startDate = db.Column(db.Date, nullable=False)
     startTime = db.Column(db.String(100))
     endDate = db.Column(db.Date, nullable=False)
     endTime = db.Column(db.String(100))
+    # UTC start and end, see database.times.event_span
+    startAt = db.Column(times.UTCDateTime, default=span_default(0))
+    endAt = db.Column(times.UTCDateTime, default=span_default(1))
     location = db.Column(db.String(100))
     category = db.Column(db.String(100))
     link = db.Column(db.String(100))
+    # Event page URL
+    source_id = db.Column(db.String(200))
 
     def __repr__(self):
         return ("UNLVCalendar(" +
@@ -232,6 +368,8 @@ class UNLVCalendar(db.Model):
 
 # Create Organization table for database
 class Organization(db.Model):
+    natural_key = ('name',)
+    search_columns = ('name',)
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(500), nullable=False, unique=True)
 
@@ -240,6 +378,15 @@ class Organization(db.Model):
                     f"id = {self.id},"
                     f"name = {self.name})")
 
+# db.create_all() and drop_all() build and drop the span R*Trees and search indexes along with the tables
+for model in (AcademicCalendar, InvolvementCenter, RebelCoverage, UNLVCalendar):
+    db.event.listen(model.__table__, 'after_create', lambda target, connection, **kw: migrations.create_span_index(connection, target))
+    db.event.listen(model.__table__, 'after_drop', lambda target, connection, **kw: migrations.drop_span_index(connection, target))
+for model in (AcademicCalendar, InvolvementCenter, RebelCoverage, UNLVCalendar, Organization):
+    db.event.listen(model.__table__, 'after_create',
+                    lambda target, connection, columns=model.search_columns, **kw: migrations.create_search_index(connection, target, columns))
+    db.event.listen(model.__table__, 'after_drop', lambda target, connection, **kw: migrations.drop_search_index(connection, target))
+
 # Parser for User table
 user_put_args = reqparse.RequestParser()
 user_put_args.add_argument("first_name", type=str, help="First name is required", required=True)
@@ -264,6 +411,7 @@ ic_put_args.add_argument("endTime", type=str, help="Event end time is required",
 ic_put_args.add_argument("location", type=str, help="Event location can be null", required=False)
 ic_put_args.add_argument("organization", type=str, help="Organization is required", required=True)
 ic_put_args.add_argument("link", type=str, help="Event link can be null", required=False)
+ic_put_args.add_argument("source_id", type=str, help="Source event id can be null", required=False)
 
 # Parser for Rebel Coverage table
 rc_put_args = reqparse.RequestParser()
@@ -275,6 +423,7 @@ rc_put_args.add_argument("endTime", type=str, help="Event end time can be null",
 rc_put_args.add_argument("location", type=str, help="Event location can be null", required=False)
 rc_put_args.add_argument("sport", type=str, help="Sport can be null", required=False)
 rc_put_args.add_argument("link", type=str, help="Event link can be null", required=False)
+rc_put_args.add_argument("source_id", type=str, help="Source event id can be null", required=False)
 
 # Parser for UNLV Calendar table
 uc_put_args = reqparse.RequestParser()
@@ -286,11 +435,30 @@ uc_put_args.add_argument("endTime", type=str, help="Event end time can be null",
 uc_put_args.add_argument("location", type=str, help="Event location can be null", required=False)
 uc_put_args.add_argument("category", type=str, help="Category can be null", required=False)
 uc_put_args.add_argument("link", type=str, help="Event link can be null", required=False)
+uc_put_args.add_argument("source_id", type=str, help="Source event id can be null", required=False)
 
 # Parser for Organization table
 organization_put_args = reqparse.RequestParser()
 organization_put_args.add_argument("name", type=str, help="Organization name is required", required=True)
 
+# Display time from a UTC column, or the stored text when it holds no clock time (ALL DAY, TBA)
+class LocalTime(fields.Raw):
+    def __init__(self, instant, **kwargs):
+        super().__init__(**kwargs)
+        self.instant = instant
+
+    def output(self, key, obj):
+        stored = fields.get_value(key, obj)
+        instant = fields.get_value(self.instant, obj)
+        if instant is None or times.parse_time(stored).minutes is None:
+            return stored
+        return times.local_clock(instant)
+
+# UTC datetime in ISO 8601, e.g. 2025-04-02T02:00:00+00:00
+class Instant(fields.Raw):
+    def format(self, value):
+        return value.isoformat()
+
 # Resource fields for User model
 user_fields = {
     'id': fields.Integer,
@@ -307,6 +475,8 @@ ac_fields = {
     'startTime': fields.String,
     'endDate': fields.String,
     'endTime': fields.String,
+    'startAt': Instant,
+    'endAt': Instant,
 }
 
 # Resource fields for Involvement Center model
@@ -314,9 +484,11 @@ ic_fields = {
     'id': fields.Integer,
     'name': fields.String,
     'startDate': fields.String,
-    'startTime': fields.String,
+    'startTime': LocalTime('startAt'),
     'endDate': fields.String,
-    'endTime': fields.String,
+    'endTime': LocalTime('endAt'),
+    'startAt': Instant,
+    'endAt': Instant,
     'location': fields.String,
     'organization': fields.String,
     'link' : fields.String
@@ -327,9 +499,11 @@ rc_fields = {
 	'id': fields.Integer,
 	'name': fields.String,
     'startDate': fields.String,
-    'startTime': fields.String,
+    'startTime': LocalTime('startAt'),
     'endDate': fields.String,
-    'endTime': fields.String,
+    'endTime': LocalTime('endAt'),
+    'startAt': Instant,
+    'endAt': Instant,
 	'location': fields.String,
 	'sport': fields.String,
     'link' : fields.String
@@ -340,9 +514,11 @@ uc_fields = {
 	'id': fields.Integer,
 	'name': fields.String,
     'startDate': fields.String,
-    'startTime': fields.String,
+    'startTime': LocalTime('startAt'),
     'endDate': fields.String,
-    'endTime': fields.String,
+    'endTime': LocalTime('endAt'),
+    'startAt': Instant,
+    'endAt': Instant,
 	'location': fields.String,
 	'category': fields.String,
     'link' : fields.String
@@ -354,6 +530,301 @@ org_fields = {
     'name': fields.String,
 }
 
+# Page sizes for the list resources
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Rows loaded per round trip while streaming an export
+EXPORT_BATCH = 1000
+
+# Default and largest window of /events/upcoming, in hours
+UPCOMING_HOURS = 2
+MAX_UPCOMING_HOURS = 7 * 24
+
+# Default number of /events/search results
+SEARCH_LIMIT = 50
+
+# Model, parser and fields for each table, keyed by endpoint prefix
+bulk_tables = {
+    'academiccalendar': (AcademicCalendar, ac_put_args, ac_fields),
+    'involvementcenter': (InvolvementCenter, ic_put_args, ic_fields),
+    'rebelcoverage': (RebelCoverage, rc_put_args, rc_fields),
+    'unlvcalendar': (UNLVCalendar, uc_put_args, uc_fields),
+    'organization': (Organization, organization_put_args, org_fields),
+}
+
+# Event tables served together by the /events feed
+event_tables = ('academiccalendar', 'involvementcenter', 'rebelcoverage', 'unlvcalendar')
+
+# Tables /events/search looks in
+search_tables = event_tables + ('organization',)
+
+# Query parameter that filters a feed table, and the column it matches
+feed_filters = {
+    'involvementcenter': ('organizations', 'organization'),
+    'rebelcoverage': ('sports', 'sport'),
+    'unlvcalendar': ('categories', 'category'),
+}
+
+def feed_sources(tables=event_tables):
+    # sources=academiccalendar,rebelcoverage (or repeated) picks which tables to include
+    sources = [name for arg in request.args.getlist('sources') for name in arg.split(',')] or tables
+    unknown = set(sources) - set(tables)
+    if unknown:
+        abort(HTTPStatus.BAD_REQUEST, message=f"Unknown sources: {', '.join(sorted(unknown))}")
+    return [name for name in tables if name in sources]
+
+def search_query(phrase):
+    # FTS5 query matching every word of phrase as a prefix, e.g. chess cl -> "chess"* "cl"*
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", phrase))
+
+def search_index(table):
+    # The table's FTS5 index, see migrations.create_search_index
+    name = f"{table.__tablename__}_search"
+    return sql_table(name, column('rowid'), column('rank'), column(name))
+
+def matching(table, query):
+    # Select (row, rank) of the rows matching an FTS5 query, best first
+    index = search_index(table)
+    return select(table, index.c.rank).join(index, index.c.rowid == table.id).where(
+        index.c[index.name].op('MATCH')(query)
+    ).order_by(index.c.rank)
+
+def preferences(name):
+    """
+    Filters for the user's picks on a table, from the organizations=, sports=
+    or categories= query parameters (repeat the parameter for several values).
+    An empty value matches nothing, a missing parameter matches everything.
+    """
+    if name not in feed_filters:
+        return []
+    arg, column = feed_filters[name]
+    if arg not in request.args:
+        return []
+    return [getattr(bulk_tables[name][0], column).in_(request.args.getlist(arg))]
+
+def is_paged():
+    # The list resources return everything unless a page is asked for
+    return 'limit' in request.args or 'after' in request.args
+
+def page(query, item_fields, *columns):
+    """
+    One page of a list resource using keyset pagination.
+    ?limit=N (default PAGE_SIZE, at most MAX_PAGE_SIZE) and ?after=<cursor>, where the
+    cursor is an opaque token holding the sort columns of the last row.
+    Returns {'items': [...], 'next': cursor of the next page or None}.
+    """
+    try:
+        limit = min(int(request.args.get('limit', PAGE_SIZE)), MAX_PAGE_SIZE)
+        if limit < 1:
+            raise ValueError
+    except ValueError:
+        abort(HTTPStatus.BAD_REQUEST, message=f"limit must be a number from 1 to {MAX_PAGE_SIZE}.")
+    after = request.args.get('after')
+    if after:
+        try:
+            values = [cursor_value(column, value) for column, value in zip(columns, read_cursor(after, len(columns)))]
+        except (ValueError, TypeError):
+            abort(HTTPStatus.BAD_REQUEST, message="Invalid cursor. Pass back the 'next' value of the previous page.")
+        query = query.filter(tuple_(*columns) > tuple_(*values))
+    rows = query.order_by(*columns).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = make_cursor(getattr(rows[-1], column.key) for column in columns)
+    return {'items': marshal(rows, item_fields), 'next': next_cursor}
+
+def make_cursor(values):
+    # URL-safe base64 of the key as a JSON list, so values may hold commas or anything else
+    key = [value.isoformat() if isinstance(value, date) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip('=')
+
+def read_cursor(cursor, length):
+    # The key list of a cursor from make_cursor, ValueError if it is not one
+    key = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    if not isinstance(key, list) or len(key) != length:
+        raise ValueError("Cursor does not match the sort columns")
+    return key
+
+def cursor_value(column, value):
+    # Turn one part of a cursor back into the column's type
+    python_type = column.type.python_type
+    if python_type is date:
+        return date.fromisoformat(value)
+    if not isinstance(value, python_type):
+        raise TypeError(f"Expected {python_type.__name__} in cursor")
+    return value
+
+def bulk_args(parser, row):
+    # Validate one row of a bulk request against the table's PUT parser
+    if not isinstance(row, dict):
+        raise ValueError("Row must be a JSON object")
+    args = {}
+    for arg in parser.args:
+        value = row.get(arg.name)
+        if value is None and arg.required:
+            raise ValueError(f"{arg.name}: {arg.help}")
+        args[arg.name] = str(value) if value is not None else None
+    return args
+
+def bulk_values(table, parser, row):
+    # Column values for one row of a bulk request
+    args = bulk_args(parser, row)
+    if table == Organization:
+        return {'name': args['name']}
+    start_date, end_date = parse_dates(table, args['startDate'], args['endDate'])
+    return event_values(table, args, start_date, end_date)
+
+def bulk_add(table, parser, rows):
+    """
+    Insert a batch of rows in one transaction.
+    Returns a per-row report with a status of created, duplicate or error.
+    """
+    results = []
+    pending = {}
+    for index, row in enumerate(rows):
+        try:
+            values = bulk_values(table, parser, row)
+        except (ValueError, TypeError) as e:
+            results.append({'index': index, 'status': 'error', 'message': str(e)})
+            continue
+        # Later copies of a row in the same batch are duplicates of the first
+        key = row_key(table, values)
+        if key in pending:
+            results.append({'index': index, 'status': 'duplicate'})
+            continue
+        pending[key] = (len(results), values)
+        results.append({'index': index, 'status': 'created'})
+
+    # Resolve the whole batch against the table at once
+    existing = existing_keys(db.session, table, list(pending))
+    new_keys = [key for key in pending if key not in existing]
+    for key in existing:
+        results[pending[key][0]]['status'] = 'duplicate'
+    insert_new(db.session, table, [pending[key][1] for key in new_keys])
+    ids = existing_keys(db.session, table, new_keys)
+    db.session.commit()
+    if ids:
+        touch(table)
+    for key, row_id in ids.items():
+        results[pending[key][0]]['id'] = row_id
+    return {
+        'created': len(ids),
+        'duplicate': sum(1 for r in results if r['status'] == 'duplicate'),
+        'error': sum(1 for r in results if r['status'] == 'error'),
+        'results': results
+    }
+
+def upsert(table, parser, rows):
+    """
+    Insert new rows and update changed ones in place.
+    Rows are matched on the table's source_key, falling back to the natural key for rows
+    without a source id and for stored rows from before source ids were kept.
+    All writes run in one transaction. When one collides with another stored event the
+    batch is retried with a savepoint per row, so that row is reported on its own
+    instead of failing the batch.
+    Returns a per-row report with a status of created, updated, unchanged, duplicate,
+    conflict (an update onto another event's name and start) or error.
+    """
+    results = []
+    batch = []
+    seen = set()
+    for index, row in enumerate(rows):
+        try:
+            values = bulk_values(table, parser, row)
+        except (ValueError, TypeError) as e:
+            results.append({'index': index, 'status': 'error', 'message': str(e)})
+            continue
+        key = ('source',) + source_key(table, values) if values.get('source_id') else row_key(table, values)
+        if key in seen:
+            results.append({'index': index, 'status': 'duplicate'})
+            continue
+        seen.add(key)
+        batch.append((len(results), values))
+        results.append({'index': index, 'status': 'created'})
+
+    # Stored rows for each position in the batch, by source id first
+    stored = existing_sources(db.session, table, [source_key(table, values) for _, values in batch if values.get('source_id')])
+    matches = {position: stored[source_key(table, values)] for position, values in batch
+               if values.get('source_id') and source_key(table, values) in stored}
+    claimed = {event.id for event in matches.values()}
+    rest = [(position, values) for position, values in batch if position not in matches]
+    ids = existing_keys(db.session, table, [row_key(table, values) for _, values in rest])
+    events = {event.id: event for event in table.query.filter(table.id.in_(ids.values()))}
+    for position, values in rest:
+        event = events.get(ids.get(row_key(table, values)))
+        if event is None or event.id in claimed:
+            continue
+        if event.source_id and values.get('source_id') and event.source_id != values['source_id']:
+            # A different source event with the same name and start, inserted (or found a duplicate) below
+            continue
+        matches[position] = event
+        claimed.add(event.id)
+
+    writes = []
+    for position, values in batch:
+        event = matches.get(position)
+        if event is None:
+            writes.append((position, values, None))
+            continue
+        results[position]['id'] = event.id
+        # A row sent without a source id keeps the one already stored
+        changes = {col: value for col, value in values.items()
+                   if getattr(event, col) != value and not (col == 'source_id' and value is None)}
+        if changes:
+            writes.append((position, changes, event))
+        else:
+            results[position]['status'] = 'unchanged'
+
+    # Updates go first so a new row can take the name and start of an event moving away
+    writes.sort(key=lambda write: write[2] is None)
+    failed = []
+    try:
+        # The usual batch has no collisions and is written under a single savepoint
+        with db.session.begin_nested():
+            for write in writes:
+                apply_write(table, results, *write)
+    except IntegrityError:
+        # Otherwise every write gets its own, retried while others succeed (two events swapping times)
+        pending = writes
+        while True:
+            failed = []
+            for write in pending:
+                try:
+                    with db.session.begin_nested():
+                        apply_write(table, results, *write)
+                except IntegrityError:
+                    failed.append(write)
+            if not failed or len(failed) == len(pending):
+                break
+            pending = failed
+    failed_positions = {position for position, _, _ in failed}
+    for position, values, event in writes:
+        if position not in failed_positions:
+            results[position]['status'] = 'created' if event is None else 'updated'
+    for position, values, event in failed:
+        if event is None:
+            results[position]['status'] = 'duplicate'
+            results[position].pop('id', None)
+        else:
+            results[position]['status'] = 'conflict'
+            results[position]['message'] = "Another stored event has this name and start"
+    db.session.commit()
+
+    counts = {status: sum(1 for r in results if r['status'] == status)
+              for status in ('created', 'updated', 'unchanged', 'duplicate', 'conflict', 'error')}
+    if counts['created'] or counts['updated']:
+        touch(table)
+    return dict(counts, results=results)
+
+def apply_write(table, results, position, values, event):
+    # Insert a new row (event is None) or change a stored one, flushed by the caller's savepoint
+    if event is None:
+        results[position]['id'] = db.session.execute(insert(table.__table__).values(values)).inserted_primary_key[0]
+    else:
+        for col, value in values.items():
+            setattr(event, col, value)
+
 # Commands for User model
 class User_Info(Resource):
     # GET item from User table
@@ -376,6 +847,7 @@ class User_Add(Resource):
         user = User(first_name=args['first_name'], last_name=args['last_name'], nshe=args['nshe'])
         db.session.add(user)
         db.session.commit()
+        touch(User)
         return user, HTTPStatus.CREATED
 
 class User_Delete(Resource):
@@ -386,6 +858,7 @@ class User_Delete(Resource):
         if not result:
             abort(HTTPStatus.CONFLICT, message="NSHE not found")
         db.session.commit()
+        touch(User)
         # Return the count of deleted items, or a message
         # Since marshal_with expects a model instance or list, direct count might not work well.
         # Returning a message might be more appropriate for DELETE operations.
@@ -398,6 +871,8 @@ class User_Delete_All(Resource):
     def delete(self):
         result = User.query.delete()
         db.session.commit()
+        if result:
+            touch(User)
         if not result:
             # abort(HTTPStatus.NOT_FOUND, message="Nothing to delete.") # Or just return success if 0 deleted is ok
             return make_response(jsonify(
@@ -426,23 +901,20 @@ class AcademicCalendar_Add(Resource):
         if not start_date:
             abort(HTTPStatus.CONFLICT, message="Event already exists...")
 
-        event = AcademicCalendar(
-            name=args['name'],
-            startDate=start_date,
-            startTime=args.get('startTime'),
-            endDate=end_date,
-            endTime=args.get('endTime')
-        )
+        event = new_event(AcademicCalendar, args, start_date, end_date)
         db.session.add(event)
         db.session.commit()
+        touch(AcademicCalendar)
         return event, HTTPStatus.CREATED
 
 class AcademicCalendar_Delete_Past(Resource):
     # DELETE past items from Academic Calendar table
     # @marshal_with(ac_fields) # Less suitable for bulk delete confirmation
     def get(self):
-        delete_count = db.session.query(AcademicCalendar).filter(AcademicCalendar.startDate < (datetime.now().date())).delete()
+        delete_count = db.session.query(AcademicCalendar).filter(ended(AcademicCalendar)).delete()
         db.session.commit()
+        if delete_count:
+            touch(AcademicCalendar)
         # if not delete_count:
             # abort(HTTPStatus.NOT_FOUND, message="Nothing to delete.")
             # return jsonify(message="No past Academic Calendar events found to delete."), HTTPStatus.OK
@@ -454,6 +926,8 @@ class AcademicCalendar_Delete_All(Resource):
     def delete(self):
         delete_count = AcademicCalendar.query.delete()
         db.session.commit()
+        if delete_count:
+            touch(AcademicCalendar)
         if not delete_count:
             # abort(HTTPStatus.NOT_FOUND, message="Nothing to delete.")
             return make_response(jsonify(
@@ -483,26 +957,20 @@ class InvolvementCenter_Add(Resource):
         if not start_date:
             abort(HTTPStatus.CONFLICT, message="Event already exists...")
 
-        event = InvolvementCenter(
-            name=args['name'],
-            startDate=start_date,
-            startTime=format_time(args['startTime']),
-            endDate=end_date,
-            endTime=format_time(args['endTime']),
-            location=args.get('location'),
-            organization=args.get('organization'),
-            link=args.get('link')
-        )
+        event = new_event(InvolvementCenter, args, start_date, end_date)
         db.session.add(event)
         db.session.commit()
+        touch(InvolvementCenter)
         return event, HTTPStatus.CREATED
 
 class InvolvementCenter_Delete_Past(Resource):
     # DELETE past items from Involvement Center table
     # @marshal_with(ic_fields) # Less suitable for bulk delete confirmation
     def get(self):
-        delete_count = db.session.query(InvolvementCenter).filter(InvolvementCenter.startDate < (datetime.now().date())).delete()
+        delete_count = db.session.query(InvolvementCenter).filter(ended(InvolvementCenter)).delete()
         db.session.commit()
+        if delete_count:
+            touch(InvolvementCenter)
         # if not delete_count:
             # abort(HTTPStatus.NOT_FOUND, message="Nothing to delete.")
             # return jsonify(message="No past Involvement Center events found to delete."), HTTPStatus.OK
@@ -514,6 +982,8 @@ class InvolvementCenter_Delete_All(Resource):
     def delete(self):
         delete_count = InvolvementCenter.query.delete()
         db.session.commit()
+        if delete_count:
+            touch(InvolvementCenter)
         if not delete_count:
             # abort(HTTPStatus.NOT_FOUND, message="Nothing to delete.")
             return make_response(jsonify(
@@ -544,26 +1014,20 @@ class RebelCoverage_Add(Resource):
 		if not start_date:
 			abort(HTTPStatus.CONFLICT, message="Event already exists...")
 
-		event = RebelCoverage(
-			name=args['name'],
-            startDate=start_date,
-            startTime=format_time(args.get('startTime')),
-            endDate=end_date,
-            endTime=format_time(args.get('endTime')),
-			location=args.get('location'),
-			sport=args.get('sport'),
-            link=args.get('link')
-		)
+		event = new_event(RebelCoverage, args, start_date, end_date)
 		db.session.add(event)
 		db.session.commit()
+		touch(RebelCoverage)
 		return event, HTTPStatus.CREATED
 
 class RebelCoverage_Delete_Past(Resource):
 	# GET items from Rebel Coverage table
 	@marshal_with(rc_fields)
 	def get(self):
-		result = db.session.query(RebelCoverage).filter(RebelCoverage.startDate < (datetime.now().date())).delete()
+		result = db.session.query(RebelCoverage).filter(ended(RebelCoverage)).delete()
 		db.session.commit()
+		if result:
+			touch(RebelCoverage)
 		# if not result:
 			# abort(HTTPStatus.NOT_FOUND, message="Nothing to delete.")
 		# return result
@@ -574,6 +1038,8 @@ class RebelCoverage_Delete_All(Resource):
 	def delete(self):
 		delete_count = RebelCoverage.query.delete()
 		db.session.commit()
+		if delete_count:
+			touch(RebelCoverage)
 		if not delete_count:
 			# abort(HTTPStatus.NOT_FOUND, message="Nothing to delete.")
 			return make_response(jsonify(
@@ -602,26 +1068,20 @@ class UNLVCalendar_Add(Resource):
         if not start_date:
             abort(HTTPStatus.CONFLICT, message="Event already exists...")
 
-        event = UNLVCalendar(
-            name=args['name'],
-            startDate=start_date,
-            startTime=format_time(args.get('startTime')),
-            endDate=end_date,
-            endTime=format_time(args.get('endTime')),
-            location=args.get('location'),
-            category=args.get('category'), # Use category from args
-            link=args.get('link')
-        )
+        event = new_event(UNLVCalendar, args, start_date, end_date)
         db.session.add(event)
         db.session.commit()
+        touch(UNLVCalendar)
         return event, HTTPStatus.CREATED
 
 class UNLVCalendar_Delete_Past(Resource):
     # DELETE past items from UNLV Calendar table
     # @marshal_with(uc_fields) # Less suitable for bulk delete confirmation
     def get(self):
-        delete_count = db.session.query(UNLVCalendar).filter(UNLVCalendar.startDate < (datetime.now().date())).delete()
+        delete_count = db.session.query(UNLVCalendar).filter(ended(UNLVCalendar)).delete()
         db.session.commit()
+        if delete_count:
+            touch(UNLVCalendar)
         # if not delete_count:
             # abort(HTTPStatus.NOT_FOUND, message="Nothing to delete.")
             # return jsonify(message="No past UNLV Calendar events found to delete."), HTTPStatus.OK
@@ -633,6 +1093,8 @@ class UNLVCalendar_Delete_All(Resource):
     def delete(self):
         delete_count = UNLVCalendar.query.delete()
         db.session.commit()
+        if delete_count:
+            touch(UNLVCalendar)
         if not delete_count:
             # abort(HTTPStatus.NOT_FOUND, message="Nothing to delete.")
             return make_response(jsonify(
@@ -665,6 +1127,7 @@ class Organization_Add(Resource):
         )
         db.session.add(organization)
         db.session.commit()
+        touch(Organization)
         return organization, HTTPStatus.CREATED
 
 class Organization_Delete_All(Resource):
@@ -672,6 +1135,8 @@ class Organization_Delete_All(Resource):
     def delete(self):
         delete_count = Organization.query.delete()
         db.session.commit()
+        if delete_count:
+            touch(Organization)
         if not delete_count:
             # abort(HTTPStatus.NOT_FOUND, message="Organization table is already empty or deletion failed.")
             return make_response(jsonify(
@@ -681,76 +1146,113 @@ class Organization_Delete_All(Resource):
             message=f"Deleted {delete_count} organizations."
         ), HTTPStatus.OK)
 
+# Bulk PUT for any table in bulk_tables
+class Bulk_Add(Resource):
+    def __init__(self, table):
+        self.table, self.parser, self.fields = bulk_tables[table]
+
+    # PUT a JSON array of items into the table
+    def put(self):
+        rows = request.get_json(silent=True)
+        if not isinstance(rows, list):
+            abort(HTTPStatus.BAD_REQUEST, message="Request body must be a JSON array of items.")
+        return make_response(jsonify(bulk_add(self.table, self.parser, rows)), HTTPStatus.OK)
+
+class Bulk_Upsert(Bulk_Add):
+    # PUT a JSON array of items, updating the stored copy of items that changed
+    def put(self):
+        rows = request.get_json(silent=True)
+        if not isinstance(rows, list):
+            abort(HTTPStatus.BAD_REQUEST, message="Request body must be a JSON array of items.")
+        return make_response(jsonify(upsert(self.table, self.parser, rows)), HTTPStatus.OK)
+
 # List all items in User model table
 class User_List(Resource):
-    @marshal_with(user_fields)
+    @conditional(User)
     def get(self):
+        if is_paged():
+            return page(User.query, user_fields, User.last_name, User.first_name, User.id)
         # Corrected order_by usage for multiple columns
         result = User.query.order_by(User.last_name.asc(), User.first_name.asc()).all()
         if not result:
             abort(HTTPStatus.NOT_FOUND, message="User table is empty")
-        return result
+        return marshal(result, user_fields)
 
 # List all items in Academic Calendar table
 class AcademicCalendar_List(Resource):
-    @marshal_with(ac_fields)
+    @conditional(AcademicCalendar)
     def get(self):
+        if is_paged():
+            return page(AcademicCalendar.query, ac_fields, AcademicCalendar.startDate, AcademicCalendar.id)
         result = AcademicCalendar.query.order_by(AcademicCalendar.startDate.asc()).all()
         if not result:
             abort(HTTPStatus.NOT_FOUND, message="Academic Calendar table is empty")
-        return result
+        return marshal(result, ac_fields)
 
 # List all items in Involvement Center table
 class InvolvementCenter_List(Resource):
-    @marshal_with(ic_fields)
+    @conditional(InvolvementCenter)
     def get(self):
-        result = InvolvementCenter.query.order_by(InvolvementCenter.startDate.asc()).all()
+        query = InvolvementCenter.query.filter(*preferences('involvementcenter'))
+        if is_paged():
+            return page(query, ic_fields, InvolvementCenter.startDate, InvolvementCenter.id)
+        result = query.order_by(InvolvementCenter.startDate.asc()).all()
         if not result:
             abort(HTTPStatus.NOT_FOUND, message="Involvement Center table is empty")
-        return result
+        return marshal(result, ic_fields)
 
 # List all items in Rebel Coverage table
 class RebelCoverage_List(Resource):
-	@marshal_with(rc_fields)
+	@conditional(RebelCoverage)
 	def get(self):
-		result = RebelCoverage.query.order_by(RebelCoverage.startDate.asc()).all()
+		query = RebelCoverage.query.filter(*preferences('rebelcoverage'))
+		if is_paged():
+			return page(query, rc_fields, RebelCoverage.startDate, RebelCoverage.id)
+		result = query.order_by(RebelCoverage.startDate.asc()).all()
 		if not result:
 			abort(HTTPStatus.NOT_FOUND, message="Table is empty")
-		return result
+		return marshal(result, rc_fields)
 
 # List all items in UNLV Calendar table
 class UNLVCalendar_List(Resource):
-    @marshal_with(uc_fields)
+    @conditional(UNLVCalendar)
     def get(self):
-        result = UNLVCalendar.query.order_by(UNLVCalendar.startDate.asc()).all()
+        query = UNLVCalendar.query.filter(*preferences('unlvcalendar'))
+        if is_paged():
+            return page(query, uc_fields, UNLVCalendar.startDate, UNLVCalendar.id)
+        result = query.order_by(UNLVCalendar.startDate.asc()).all()
         if not result:
             abort(HTTPStatus.NOT_FOUND, message="UNLV Calendar table is empty")
-        return result
+        return marshal(result, uc_fields)
 
 # List all items in Organization table
 class Organization_List(Resource):
-    @marshal_with(org_fields)
+    @conditional(Organization)
     def get(self):
+        if is_paged():
+            return page(Organization.query, org_fields, Organization.name, Organization.id)
         result = Organization.query.order_by(Organization.name.asc()).all()
         if not result:
             abort(HTTPStatus.NOT_FOUND, message="Organization table is empty")
-        return result
+        return marshal(result, org_fields)
 
 # DAILY LISTS
 # List daily items in Academic Calendar table
 class AcademicCalendar_Daily(Resource):
+    @conditional(AcademicCalendar)
     @marshal_with(ac_fields)
     def get(self, date):
         try:
             target_date = datetime.strptime(date, "%Y-%m-%d").date()
         except ValueError:
             abort(HTTPStatus.BAD_REQUEST, message="Invalid date format. Please use YYYY-MM-DD.")
-        result = AcademicCalendar.query.filter_by(startDate=target_date).order_by(AcademicCalendar.startDate.asc()).all() # order_by might be redundant here
+        result = during(AcademicCalendar, target_date, target_date + timedelta(days=1)).all()
         if not result:
             abort(HTTPStatus.NOT_FOUND, message=f"No Academic Calendar events found for date {date}")
         return result
 
 class AcademicCalendar_Weekly(Resource):
+    @conditional(AcademicCalendar)
     @marshal_with(ac_fields)
     def get(self, date):
         try:
@@ -758,42 +1260,41 @@ class AcademicCalendar_Weekly(Resource):
         except ValueError:
             abort(HTTPStatus.BAD_REQUEST, message="Invalid start date format. Please use YYYY-MM-DD.")
         end_date = start_date + timedelta(days=7)
-        result = db.session.query(AcademicCalendar).filter(
-            AcademicCalendar.startDate >= start_date,
-            AcademicCalendar.startDate < end_date # Use < end_date for a 7-day range including start_date
-        ).order_by(AcademicCalendar.startDate.asc()).all()
+        result = during(AcademicCalendar, start_date, end_date).all()
         if not result:
             abort(HTTPStatus.NOT_FOUND, message=f"No Academic Calendar events found for the week starting {date}")
         return result
 
 class AcademicCalendar_Monthly(Resource):
+    @conditional(AcademicCalendar)
     @marshal_with(ac_fields)
     def get(self, month):
-        # Validate month format (YYYY-MM)
+        # Validate month format (YYYY-MM) and turn it into a date range
         try:
-            datetime.strptime(month, "%Y-%m")
+            start_date, end_date = month_range(month)
         except ValueError:
              abort(HTTPStatus.BAD_REQUEST, message="Invalid month format. Please use YYYY-MM.")
-        # Use func.strftime which is database-agnostic for simple cases like this
-        result = db.session.query(AcademicCalendar).filter(func.strftime("%Y-%m", AcademicCalendar.startDate) == month).order_by(AcademicCalendar.startDate.asc()).all()
+        result = during(AcademicCalendar, start_date, end_date).all()
         if not result:
             abort(HTTPStatus.NOT_FOUND, message=f"No Academic Calendar events found for month {month}")
         return result
 
 # List daily items in Involvement Center table
 class InvolvementCenter_Daily(Resource):
+    @conditional(InvolvementCenter)
     @marshal_with(ic_fields)
     def get(self, date):
         try:
             target_date = datetime.strptime(date, "%Y-%m-%d").date()
         except ValueError:
             abort(HTTPStatus.BAD_REQUEST, message="Invalid date format. Please use YYYY-MM-DD.")
-        result = InvolvementCenter.query.filter_by(startDate=target_date).order_by(InvolvementCenter.startDate.asc()).all()
+        result = during(InvolvementCenter, target_date, target_date + timedelta(days=1)).filter(*preferences('involvementcenter')).all()
         if not result:
             abort(HTTPStatus.NOT_FOUND, message=f"No Involvement Center events found for date {date}")
         return result
 
 class InvolvementCenter_Weekly(Resource):
+    @conditional(InvolvementCenter)
     @marshal_with(ic_fields)
     def get(self, date):
         try:
@@ -801,36 +1302,40 @@ class InvolvementCenter_Weekly(Resource):
         except ValueError:
             abort(HTTPStatus.BAD_REQUEST, message="Invalid start date format. Please use YYYY-MM-DD.")
         end_date = start_date + timedelta(days=7)
-        result = db.session.query(InvolvementCenter).filter(
-            InvolvementCenter.startDate >= start_date,
-            InvolvementCenter.startDate < end_date
-        ).order_by(InvolvementCenter.startDate.asc()).all()
+        result = during(InvolvementCenter, start_date, end_date).filter(*preferences('involvementcenter')).all()
         if not result:
             abort(HTTPStatus.NOT_FOUND, message=f"No Involvement Center events found for the week starting {date}")
         return result
 
 class InvolvementCenter_Monthly(Resource):
+    @conditional(InvolvementCenter)
     @marshal_with(ic_fields)
     def get(self, month):
         try:
-            datetime.strptime(month, "%Y-%m")
+            start_date, end_date = month_range(month)
         except ValueError:
              abort(HTTPStatus.BAD_REQUEST, message="Invalid month format. Please use YYYY-MM.")
-        result = db.session.query(InvolvementCenter).filter(func.strftime("%Y-%m", InvolvementCenter.startDate) == month).order_by(InvolvementCenter.startDate.asc()).all()
+        result = during(InvolvementCenter, start_date, end_date).filter(*preferences('involvementcenter')).all()
         if not result:
             abort(HTTPStatus.NOT_FOUND, message=f"No Involvement Center events found for month {month}")
         return result
 
 # List daily items in Rebel Coverage table
 class RebelCoverage_Daily(Resource):
+	@conditional(RebelCoverage)
 	@marshal_with(rc_fields)
 	def get(self, date):
-		result = RebelCoverage.query.filter_by(startDate=date).order_by(RebelCoverage.startDate.asc()).all()
+		try:
+			target_date = datetime.strptime(date, "%Y-%m-%d").date()
+		except ValueError:
+			abort(HTTPStatus.BAD_REQUEST, message="Invalid date format. Please use YYYY-MM-DD.")
+		result = during(RebelCoverage, target_date, target_date + timedelta(days=1)).filter(*preferences('rebelcoverage')).all()
 		if not result:
 			abort(HTTPStatus.NOT_FOUND, message="Table is empty")
 		return result
 
 class RebelCoverage_Weekly(Resource):
+    @conditional(RebelCoverage)
     @marshal_with(rc_fields)
     def get(self, date):
         try:
@@ -838,40 +1343,40 @@ class RebelCoverage_Weekly(Resource):
         except ValueError:
             abort(HTTPStatus.BAD_REQUEST, message="Invalid start date format. Please use YYYY-MM-DD.")
         end_date = start_date + timedelta(days=7)
-        result = db.session.query(RebelCoverage).filter(
-            RebelCoverage.startDate >= start_date,
-            RebelCoverage.startDate < end_date
-        ).order_by(RebelCoverage.startDate.asc()).all()
+        result = during(RebelCoverage, start_date, end_date).filter(*preferences('rebelcoverage')).all()
         if not result:
             abort(HTTPStatus.NOT_FOUND, message=f"No Rebel Coverage events found for the week starting {date}")
         return result
 
 class RebelCoverage_Monthly(Resource):
+    @conditional(RebelCoverage)
     @marshal_with(rc_fields)
     def get(self, month):
         try:
-            datetime.strptime(month, "%Y-%m")
+            start_date, end_date = month_range(month)
         except ValueError:
              abort(HTTPStatus.BAD_REQUEST, message="Invalid month format. Please use YYYY-MM.")
-        result = db.session.query(RebelCoverage).filter(func.strftime("%Y-%m", RebelCoverage.startDate) == month).order_by(RebelCoverage.startDate.asc()).all()
+        result = during(RebelCoverage, start_date, end_date).filter(*preferences('rebelcoverage')).all()
         if not result:
             abort(HTTPStatus.NOT_FOUND, message=f"No Rebel Coverage events found for month {month}")
         return result
 
 # List daily items in UNLV Calendar table
 class UNLVCalendar_Daily(Resource):
+    @conditional(UNLVCalendar)
     @marshal_with(uc_fields)
     def get(self, date):
         try:
             target_date = datetime.strptime(date, "%Y-%m-%d").date()
         except ValueError:
             abort(HTTPStatus.BAD_REQUEST, message="Invalid date format. Please use YYYY-MM-DD.")
-        result = UNLVCalendar.query.filter_by(startDate=target_date).order_by(UNLVCalendar.startDate.asc()).all()
+        result = during(UNLVCalendar, target_date, target_date + timedelta(days=1)).filter(*preferences('unlvcalendar')).all()
         if not result:
             abort(HTTPStatus.NOT_FOUND, message=f"No UNLV Calendar events found for date {date}")
         return result
 
 class UNLVCalendar_Weekly(Resource):
+    @conditional(UNLVCalendar)
     @marshal_with(uc_fields)
     def get(self, date):
         try:
@@ -879,26 +1384,117 @@ class UNLVCalendar_Weekly(Resource):
         except ValueError:
             abort(HTTPStatus.BAD_REQUEST, message="Invalid start date format. Please use YYYY-MM-DD.")
         end_date = start_date + timedelta(days=7)
-        result = db.session.query(UNLVCalendar).filter(
-            UNLVCalendar.startDate >= start_date,
-            UNLVCalendar.startDate < end_date
-        ).order_by(UNLVCalendar.startDate.asc()).all()
+        result = during(UNLVCalendar, start_date, end_date).filter(*preferences('unlvcalendar')).all()
         if not result:
             abort(HTTPStatus.NOT_FOUND, message=f"No UNLV Calendar events found for the week starting {date}")
         return result
 
 class UNLVCalendar_Monthly(Resource):
+    @conditional(UNLVCalendar)
     @marshal_with(uc_fields)
     def get(self, month):
         try:
-            datetime.strptime(month, "%Y-%m")
+            start_date, end_date = month_range(month)
         except ValueError:
              abort(HTTPStatus.BAD_REQUEST, message="Invalid month format. Please use YYYY-MM.")
-        result = db.session.query(UNLVCalendar).filter(func.strftime("%Y-%m", UNLVCalendar.startDate) == month).order_by(UNLVCalendar.startDate.asc()).all()
+        result = during(UNLVCalendar, start_date, end_date).filter(*preferences('unlvcalendar')).all()
         if not result:
             abort(HTTPStatus.NOT_FOUND, message=f"No UNLV Calendar events found for month {month}")
         return result
     
+# All event sources for one view in a single response
+class Events_Feed(Resource):
+    @conditional(AcademicCalendar, InvolvementCenter, RebelCoverage, UNLVCalendar)
+    def get(self, viewMode, date):
+        try:
+            start_date, end_date = view_range(viewMode, date)
+        except ValueError:
+            abort(HTTPStatus.BAD_REQUEST, message="Use daily, weekly or monthly with a YYYY-MM-DD date.")
+        feed = {}
+        for name in feed_sources():
+            table, _, table_fields = bulk_tables[name]
+            result = during(table, start_date, end_date).filter(*preferences(name)).all()
+            feed[name] = marshal(result, table_fields)
+        return feed
+
+# Events running now or starting in the next ?hours=N, all sources merged in start order
+class Events_Upcoming(Resource):
+    # Not behind @conditional, the answer moves with the clock
+    def get(self):
+        try:
+            hours = float(request.args.get('hours', UPCOMING_HOURS))
+            if not 0 < hours <= MAX_UPCOMING_HOURS:
+                raise ValueError
+        except ValueError:
+            abort(HTTPStatus.BAD_REQUEST, message=f"hours must be a number above 0 and at most {MAX_UPCOMING_HOURS}.")
+        start = utc_now()
+        end = start + timedelta(hours=hours)
+        events = []
+        for name in feed_sources():
+            table, _, table_fields = bulk_tables[name]
+            for event in overlapping(table, start, end).filter(*preferences(name)):
+                events.append((event.startAt, name, event, table_fields))
+        events.sort(key=lambda item: item[:2])
+        return {
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'events': [dict(marshal(event, table_fields), source=name) for _, name, event, table_fields in events]
+        }
+
+# Full-text search over names, locations and organizations, best matches first
+class Events_Search(Resource):
+    @conditional(AcademicCalendar, InvolvementCenter, RebelCoverage, UNLVCalendar, Organization)
+    def get(self):
+        query = search_query(request.args.get('q', ''))
+        if not query:
+            abort(HTTPStatus.BAD_REQUEST, message="q must contain at least one word.")
+        try:
+            limit = min(int(request.args.get('limit', SEARCH_LIMIT)), MAX_PAGE_SIZE)
+            if limit < 1:
+                raise ValueError
+        except ValueError:
+            abort(HTTPStatus.BAD_REQUEST, message=f"limit must be a number from 1 to {MAX_PAGE_SIZE}.")
+        # from= and to= keep events running on any day in between, both ends included
+        try:
+            first = date.fromisoformat(request.args['from']) if 'from' in request.args else None
+            last = date.fromisoformat(request.args['to']) if 'to' in request.args else None
+        except ValueError:
+            abort(HTTPStatus.BAD_REQUEST, message="from and to must be YYYY-MM-DD dates.")
+
+        results = []
+        for name in feed_sources(search_tables):
+            table, _, table_fields = bulk_tables[name]
+            if (first or last) and not hasattr(table, 'startAt'):
+                # Organizations have no dates
+                continue
+            statement = matching(table, query).where(*preferences(name))
+            if first:
+                statement = statement.where(table.endAt > times.midnight(first))
+            if last:
+                statement = statement.where(table.startAt < times.midnight(last + timedelta(days=1)))
+            for row, rank in db.session.execute(statement.limit(limit)):
+                results.append((rank, name, row, table_fields))
+        results.sort(key=lambda item: item[:2])
+        return {'results': [dict(marshal(row, table_fields), source=name) for _, name, row, table_fields in results[:limit]]}
+
+# Stream a whole table as newline-delimited JSON
+class Export_Table(Resource):
+    def get(self, table):
+        if table not in bulk_tables:
+            abort(HTTPStatus.NOT_FOUND, message=f"Unknown table '{table}'")
+        model, _, item_fields = bulk_tables[table]
+        def rows():
+            # yield_per loads EXPORT_BATCH rows at a time instead of the whole table
+            query = db.session.query(model).order_by(model.id).yield_per(EXPORT_BATCH)
+            for row in query:
+                yield json.dumps(marshal(row, item_fields)) + "\n"
+        return Response(stream_with_context(rows()), mimetype='application/x-ndjson')
+
+# Response cache hit/miss counters
+class Cache_Stats(Resource):
+    def get(self):
+        return response_cache.stats()
+
 # Clear ALL data
 class Database_Delete_All(Resource):
 	# DELETE ALL DATA FROM DATABASE
@@ -910,18 +1506,23 @@ class Database_Delete_All(Resource):
 		UNLVCalendar.query.delete()
 		Organization.query.delete()
 		db.session.commit()
+		touch(User, AcademicCalendar, InvolvementCenter, RebelCoverage, UNLVCalendar, Organization)
 		return HTTPStatus.OK
 
 # Scrape All Sites
 class Scrape_All(Resource):
-	# SCRAPE ALL SITES
+	# SCRAPE ALL SITES in the background, check progress at /scrape_status/<job>
 	def get(self):
-		academic_calendar.default()
-		involvement_center.default()
-		rebel_coverage.default()
-		# unlv_calendar.default() # this has AI that costs money per scrape so leaving out
-		organizations.default()
-		return HTTPStatus.OK
+		job = orchestrator.start()
+		return {'job': job.id, 'status': f"/scrape_status/{job.id}"}, HTTPStatus.ACCEPTED
+
+class Scrape_Status(Resource):
+	# Per-source timing, row counts and errors of a scrape job
+	def get(self, job_id):
+		job = orchestrator.get(job_id)
+		if not job:
+			abort(HTTPStatus.NOT_FOUND, message=f"No scrape job '{job_id}'")
+		return job.report()
 
 # API resources for PUT commands
 api.add_resource(User_Add, "/user_add")
@@ -931,6 +1532,12 @@ api.add_resource(RebelCoverage_Add, "/rebelcoverage_add")
 api.add_resource(UNLVCalendar_Add, "/unlvcalendar_add")
 api.add_resource(Organization_Add, "/organization_add")
 
+# API resources for bulk PUT commands (JSON array of items)
+for table in bulk_tables:
+    api.add_resource(Bulk_Add, f"/{table}_bulk_add", endpoint=f"{table}_bulk_add", resource_class_kwargs={'table': table})
+    if hasattr(bulk_tables[table][0], 'source_id'):
+        api.add_resource(Bulk_Upsert, f"/{table}_bulk_upsert", endpoint=f"{table}_bulk_upsert", resource_class_kwargs={'table': table})
+
 # API resource for DELETE commands
 api.add_resource(User_Delete, "/user_delete/<string:nshe>")
 api.add_resource(User_Delete_All, "/user_delete_all")
@@ -978,16 +1585,33 @@ api.add_resource(InvolvementCenter_Monthly, "/involvementcenter_monthly/<string:
 api.add_resource(RebelCoverage_Monthly, "/rebelcoverage_monthly/<string:month>")
 api.add_resource(UNLVCalendar_Monthly, "/unlvcalendar_monthly/<string:month>")
 
+# API resource for all event sources at once (daily, weekly or monthly)
+api.add_resource(Events_Feed, "/events/<string:viewMode>/<string:date>")
+
+# API resource for events running now or in the next few hours
+api.add_resource(Events_Upcoming, "/events/upcoming")
+
+# API resource for full-text search over all sources
+api.add_resource(Events_Search, "/events/search")
+
+# API resource for NDJSON exports of the event and organization tables
+api.add_resource(Export_Table, "/export/<string:table>.ndjson")
+
+# API resource for response cache statistics
+api.add_resource(Cache_Stats, "/cache_stats")
+
 # API resource for DELETE ALL DATA
 api.add_resource(Database_Delete_All, "/database_delete_all")
 
 # API resource for SCRAPE ALL
 api.add_resource(Scrape_All, "/scrape_all")
+api.add_resource(Scrape_Status, "/scrape_status/<string:job_id>")
 
 # default function to run API
 def default():
     with app.app_context():
         db.create_all()
+        migrations.upgrade(db)
     app.run(host='0.0.0.0', port=5050, debug=True)
 
 if __name__ == '__main__':
@@ -0,0 +1,130 @@
+"""
+Event start and end times as the scrapers send them, normalized
+
+Sources write times in many ways ("8:30 pm", "17:15:00", "7PM", "11 a.m.",
+"6:00 - 8:00 PM", "All Day", "TBA"). parse_time() reads them with compiled
+patterns into minutes since midnight plus the display string stored in the
+tables, e.g. "8:30 PM". Text without a time in it (All Day, TBA) has no
+minutes and is stored upper cased. Results are memoized, since a scrape
+repeats the same few dozen times thousands of times.
+
+event_span() turns an event's local dates and times into the UTC startAt /
+endAt instants the tables are queried by.
+"""
+import re
+from collections import namedtuple
+from datetime import datetime, time, timedelta, timezone
+from functools import lru_cache
+from pytz import timezone as zone
+from sqlalchemy import DateTime, TypeDecorator
+
+# minutes: since midnight, or None when the text holds no clock time
+EventTime = namedtuple('EventTime', ['minutes', 'display'])
+
+TIME = re.compile(r"""
+    (?<!\d)(?P<hour>\d{1,2})(?!\d)
+    (?: [:.](?P<minute>\d{2}) (?: :(?P<second>\d{2}) )? )?
+    \s* (?: (?P<meridiem>[ap]) \.?\s*m\b\.? )?
+""", re.IGNORECASE | re.VERBOSE)
+# "6 - 8 PM": the meridiem after a range applies to its start too
+MERIDIEM = re.compile(r"(?<![a-z])([ap])\.?\s*m\b", re.IGNORECASE)
+WORDS = {'noon': 12 * 60, 'midnight': 0}
+
+CACHE_SIZE = 4096
+
+# All sources list their events in campus time
+LOCAL = zone('America/Los_Angeles')
+
+def clock(minutes):
+    hour, minute = divmod(minutes, 60)
+    return f"{hour % 12 or 12}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_time(text):
+    """Return the EventTime for a time as a source wrote it."""
+    if not text:
+        return EventTime(None, "")
+    text = str(text).strip()
+    lowered = text.lower()
+    if lowered in WORDS:
+        return EventTime(WORDS[lowered], clock(WORDS[lowered]))
+    if not any(char.isdigit() for char in text):
+        # All Day, TBA, ...
+        return EventTime(None, text.upper())
+    for match in TIME.finditer(text):
+        hour = int(match['hour'])
+        minute = int(match['minute'] or 0)
+        meridiem = match['meridiem']
+        if meridiem is None:
+            later = MERIDIEM.search(text, match.end())
+            meridiem = later.group(1) if later else None
+            if meridiem is None and match['minute'] is None:
+                # A bare number is not a time
+                continue
+        if minute > 59:
+            continue
+        if meridiem is None:
+            # 24 hour clock, "17:15" or "17:15:00"
+            if hour > 23:
+                continue
+        else:
+            if not 1 <= hour <= 12:
+                continue
+            hour = hour % 12 + (12 if meridiem.lower() == 'p' else 0)
+        return EventTime(hour * 60 + minute, clock(hour * 60 + minute))
+    return EventTime(None, text)
+
+def display_time(text):
+    # Display string to store for a time as a source wrote it
+    return parse_time(text).display
+
+def midnight(day):
+    # UTC instant of the local midnight that starts day
+    return at(day, 0)
+
+def at(day, minutes):
+    # UTC instant of a local date and minutes since midnight
+    local = datetime.combine(day, time()) + timedelta(minutes=minutes)
+    return LOCAL.localize(local).astimezone(timezone.utc)
+
+def event_span(start_date, start_time, end_date, end_time):
+    """
+    UTC (startAt, endAt) of an event from its local dates and times as stored.
+    Without a start time the event starts at midnight, without an end time it
+    runs to the end of its end date.
+    """
+    start = parse_time(start_time).minutes
+    end = parse_time(end_time).minutes
+    end_date = end_date or start_date
+    start_at = at(start_date, start or 0)
+    if end is None:
+        return start_at, midnight(end_date + timedelta(days=1))
+    end_at = at(end_date, end)
+    if end_at < start_at:
+        # "10:00 PM" to "1:00 AM" on the same date ends the next day
+        end_at = at(end_date + timedelta(days=1), end)
+    return start_at, end_at
+
+def epoch_minute(instant):
+    # Whole minutes since 1970-01-01 UTC, rounded down
+    return int(instant.timestamp() // 60)
+
+def local_clock(instant):
+    # Display time of a UTC instant in campus time, e.g. "7:00 PM"
+    local = instant.astimezone(LOCAL)
+    return clock(local.hour * 60 + local.minute)
+
+class UTCDateTime(TypeDecorator):
+    """Aware datetimes, stored as naive UTC since SQLite keeps no time zones."""
+    impl = DateTime
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+    def process_result_value(self, value, dialect):
+        if value is not None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value
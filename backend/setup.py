@@ -10,11 +10,11 @@ setup(
     py_modules=['webscraping', 'database', 'tests'],
     entry_points={
         'console_scripts': [
-            'academic_calendar = webscraping.academic_calendar:default',
-            'involvement_center = webscraping.involvement_center:default',
+            'academic_calendar = webscraping.academic_calendar:main',
+            'involvement_center = webscraping.involvement_center:main',
             'organizations = webscraping.organizations:default',
-            'rebel_coverage = webscraping.rebel_coverage:default',
-            'unlv_calendar = webscraping.unlv_calendar:default',
+            'rebel_coverage = webscraping.rebel_coverage:main',
+            'unlv_calendar = webscraping.unlv_calendar:main',
             'serve_data = database.serve_data:default',
             'test_academicCalendar = tests.test_academicCalendar:unittest.main',
             'test_involvementCenter = tests.test_involvementCenter:unittest.main',
@@ -0,0 +1,34 @@
+import httpx
+import pytest
+from database.serve_data import app as flask_app, db, response_cache
+from webscraping import scraper, state as scrape_state
+from webscraping.scraper import new_client as real_new_client
+
+@pytest.fixture
+def app():
+    flask_app.config['TESTING'] = True
+    flask_app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+    # Tables were recreated behind the API's back
+    response_cache.clear()
+    yield flask_app
+
+@pytest.fixture
+def client(app):
+    with app.test_client() as client:
+        yield client
+
+@pytest.fixture
+def mock_http(monkeypatch):
+    # Scrapers talk to handler(request) instead of the network
+    def use(handler):
+        monkeypatch.setattr(scraper, 'new_client', lambda: real_new_client(httpx.MockTransport(handler)))
+    return use
+
+@pytest.fixture(autouse=True)
+def state_dir(monkeypatch, tmp_path):
+    # Keep every test's scraper state out of webscraping/state
+    monkeypatch.setattr(scrape_state, 'STATE_DIR', str(tmp_path / "state"))
+    return tmp_path / "state"
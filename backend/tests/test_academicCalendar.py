@@ -2,6 +2,8 @@ import unittest
 import os
 from http import HTTPStatus
 import time
+import httpx
+from webscraping import academic_calendar
 from webscraping.academic_calendar import scrape
 from database.serve_data import app as flask_app, db
 
@@ -161,6 +163,37 @@ class TestACScraperAPI(unittest.TestCase):
             except Exception as e:
                 print(f"Could not delete {db_path}: {e}")
 
+# ------------------ Unchanged Page Tests ------------------
+CATALOG_PAGE = """<table><tr><td class="block_content" colspan="2"><table border="1">
+<tr><td>Monday, January 20, 2025</td><td>Martin Luther King Jr. Day</td></tr>
+<tr><td>Tuesday, January 21, 2025</td><td>Instruction begins</td></tr>
+<tr><td>Notice</td><td>1</td></tr><tr><td>Notice</td><td>2</td></tr><tr><td>Notice</td><td>3</td></tr>
+</table></td></tr></table>"""
+
+def test_unchanged_page_is_not_parsed(client, mock_http, monkeypatch):
+    sent = []
+    responses = [
+        httpx.Response(200, text=CATALOG_PAGE, headers={'ETag': '"v1"'}),
+        httpx.Response(304),
+        # Same body again from a server that ignores If-None-Match
+        httpx.Response(200, text=CATALOG_PAGE),
+        httpx.Response(200, text=CATALOG_PAGE),
+    ]
+    def handler(request):
+        sent.append(request.headers.get('If-None-Match'))
+        return responses.pop(0)
+    mock_http(handler)
+
+    assert academic_calendar.default()['created'] == 2
+    assert academic_calendar.default()['page'] == 'unchanged'
+    assert sent[1] == '"v1"'
+    assert academic_calendar.default()['page'] == 'unchanged'
+    # --force fetches without validators and ingests regardless
+    report = academic_calendar.default(force=True)
+    assert report['duplicate'] == 2 and 'page' not in report
+    assert sent[3] is None
+
+
 if __name__ == '__main__':
     # Ensure the script using this test class is run directly
     unittest.main()
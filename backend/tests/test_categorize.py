@@ -0,0 +1,82 @@
+import json
+from types import SimpleNamespace
+from openai import OpenAI
+from webscraping import categorize, state as scrape_state
+
+def test_openai_backend_builds_real_client(monkeypatch):
+    # openai and httpx versions that disagree fail here, not silently in default_backend()
+    monkeypatch.setenv('OPENAI_API_KEY', "sk-test")
+    monkeypatch.delenv('CATEGORIZE_BACKEND', raising=False)
+    backend = categorize.default_backend()
+    assert isinstance(backend, categorize.OpenAIBackend)
+    assert isinstance(backend.client, OpenAI) and backend.client.api_key == "sk-test"
+
+class FakeCompletions:
+    # Stands in for client.chat.completions, answering with one JSON object per call
+    def __init__(self, *answers):
+        self.answers = list(answers)
+
+    def create(self, **kwargs):
+        content = json.dumps(self.answers.pop(0))
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+def fake_client(*answers):
+    return SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(*answers)))
+
+def test_openai_backend_caches_only_valid_answers():
+    titles = ["Alpha", "Beta", "Gamma", "Delta"]
+    # Beta is null, Gamma is not a category and Delta is missing
+    model = categorize.OpenAIBackend(fake_client({"1": "Tech", "2": None, "3": "Astrology"}))
+    assert categorize.categorize(titles, model, categorize.LocalClassifier()) == dict.fromkeys(titles) | {"Alpha": "Tech"}
+    assert scrape_state.load(categorize.CACHE)['titles'] == {"Alpha": "Tech"}
+
+    # Only the three unanswered titles are asked again, in sorted order
+    model = categorize.OpenAIBackend(fake_client({"1": "Arts", "2": "Career", "3": "None"}))
+    assert categorize.categorize(titles, model, categorize.LocalClassifier()) == {"Alpha": "Tech", "Beta": "Arts", "Gamma": None, "Delta": "Career"}
+    assert model.client.chat.completions.answers == []
+
+def test_stub_answers_stay_out_of_state(state_dir, monkeypatch):
+    monkeypatch.setenv('CATEGORIZE_BACKEND', 'stub')
+    assert categorize.categorize(["Alpha"], classifier=categorize.LocalClassifier()) == {"Alpha": None}
+    assert not (state_dir / f"{categorize.CACHE}.json").exists()
+
+# ------------------ Categorize Tests ------------------
+def test_categorize_caches_titles(monkeypatch):
+    monkeypatch.setattr(categorize, 'BATCH_SIZE', 2)
+    # Titles the local classifier has nothing to go on for
+    titles = ["Alpha", "Beta", "Gamma", "Delta", "Alpha", "Omega"]
+    model = categorize.StubBackend({"Alpha": "Tech", "Beta": "Arts", "Gamma": "Health", "Delta": "None", "Omega": "Astrology"}, persist=True)
+    result = categorize.categorize(titles, model, categorize.LocalClassifier())
+    assert result == {"Alpha": "Tech", "Beta": "Arts", "Gamma": "Health", "Delta": None, "Omega": None}
+    # Five distinct titles in batches of two
+    assert sorted(len(batch) for batch in model.batches) == [1, 2, 2]
+
+    # "None" is an answer worth keeping, "Astrology" is not
+    rerun = categorize.StubBackend({"Omega": "Arts"}, persist=True)
+    assert categorize.categorize(titles, rerun, categorize.LocalClassifier()) == dict(result, Omega="Arts")
+    assert rerun.batches == [["Omega"]]
+
+def test_categorize_retries_failed_batches():
+    class Down:
+        def categorize(self, titles):
+            raise ConnectionError("model unavailable")
+    assert categorize.categorize(["Alpha"], Down(), categorize.LocalClassifier()) == {"Alpha": None}
+    model = categorize.StubBackend({"Alpha": "Tech"}, persist=True)
+    assert categorize.categorize(["Alpha"], model, categorize.LocalClassifier()) == {"Alpha": "Tech"}
+    assert model.batches == [["Alpha"]]
+
+def test_local_classifier_asks_model_only_when_unsure(client):
+    # Categorized events already in the table train the TF-IDF model
+    client.put('/unlvcalendar_bulk_add', json=[
+        {"name": name, "startDate": "Friday, April 4, 2025", "endDate": "Friday, April 4, 2025", "category": category}
+        for name, category in [("Rebel Rumble Showcase", "Sports"), ("Rebel Rumble Tailgate", "Sports"), ("Open Mic Night", "Arts")]
+    ])
+    model = categorize.StubBackend({"Quarterly Town Hall": "Community"})
+    result = categorize.categorize(["Spring Career Fair", "Rumble Finals", "Quarterly Town Hall"], model)
+    assert result == {"Spring Career Fair": "Career", "Rumble Finals": "Sports", "Quarterly Town Hall": "Community"}
+    assert model.batches == [["Quarterly Town Hall"]]
+
+def test_local_classifier_works_offline(monkeypatch):
+    monkeypatch.setenv('CATEGORIZE_BACKEND', 'local')
+    result = categorize.categorize(["Yoga on the Lawn", "Quarterly Town Hall"], classifier=categorize.LocalClassifier())
+    assert result == {"Yoga on the Lawn": "Health", "Quarterly Town Hall": None}
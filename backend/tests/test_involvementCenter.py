@@ -2,6 +2,8 @@ import unittest
 import os
 from http import HTTPStatus
 import time
+import httpx
+from webscraping import involvement_center, state as scrape_state
 from webscraping.involvement_center import scrape
 from database.serve_data import app as flask_app, db
 
@@ -166,6 +168,35 @@ class TestICScraperAPI(unittest.TestCase):
             except Exception as e:
                 print(f"Could not delete {db_path}: {e}")
 
+# ------------------ Incremental Scrape Tests ------------------
+def ic_event(event_id, name, location="Student Union"):
+    return {
+        'id': event_id, 'name': name, 'location': location, 'organizationName': "Tech Club",
+        'startsOn': "2025-04-01T19:00:00+00:00", 'endsOn': "2025-04-01T21:00:00+00:00"
+    }
+
+def test_involvement_center_sends_only_changes(client, mock_http, monkeypatch):
+    catalog = [ic_event(1, "Hackathon"), ic_event(2, "Game Night"), ic_event(3, "Resume Review")]
+    requested = []
+    def handler(request):
+        skip = int(request.url.params['skip'])
+        requested.append(skip)
+        return httpx.Response(200, json={'value': catalog[skip:skip + involvement_center.PAGE_SIZE]})
+    mock_http(handler)
+    monkeypatch.setattr(involvement_center, 'PAGE_SIZE', 2)
+
+    assert involvement_center.default()['created'] == 3
+    assert requested == [0, 2]
+    assert involvement_center.default()['results'] == []
+
+    catalog[1] = ic_event(2, "Game Night", location="SU 208")
+    catalog.append(ic_event(4, "Movie Night"))
+    report = involvement_center.default()
+    assert [result['index'] for result in report['results']] == [0, 1]
+    assert report['updated'] == 1 and report['created'] == 1
+    assert set(scrape_state.load("involvement_center")['seen']) == {"1", "2", "3", "4"}
+
+
 if __name__ == '__main__':
     # Ensure the script using this test class is run directly
     unittest.main()
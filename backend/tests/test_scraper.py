@@ -0,0 +1,170 @@
+import asyncio
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+import pytest
+import database
+from webscraping import orchestrator, scraper
+from webscraping.scraper import Scraper, new_client as real_new_client
+from webscraping.session import ScraperSession
+
+# ------------------ Scrape Orchestration Tests ------------------
+def test_scrape_all_runs_sources_concurrently(client, monkeypatch):
+    barrier = threading.Barrier(2, timeout=5)
+    def scraper():
+        # Only returns once both sources are running at the same time
+        barrier.wait()
+        return {'created': 2, 'duplicate': 1, 'error': 0}
+    def broken():
+        barrier.wait()
+        raise ValueError("page layout changed")
+    monkeypatch.setattr(orchestrator, 'SOURCES', {'good': scraper, 'bad': broken})
+
+    res = client.get('/scrape_all')
+    assert res.status_code == HTTPStatus.ACCEPTED
+    status_url = res.json['status']
+    for _ in range(50):
+        report = client.get(status_url).json
+        if report['status'] != 'running':
+            break
+        time.sleep(0.1)
+    assert report['status'] == 'failed'
+    assert report['sources']['good']['status'] == 'done' and report['sources']['good']['created'] == 2
+    assert report['sources']['bad']['message'] == "ValueError: page layout changed"
+
+def test_scrape_status_unknown_job(client):
+    assert client.get('/scrape_status/nope').status_code == HTTPStatus.NOT_FOUND
+
+def test_job_history_keeps_running_jobs(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(orchestrator, 'SOURCES', {'slow': lambda: release.wait(5) and {}})
+    monkeypatch.setattr(orchestrator, '_jobs', OrderedDict())
+    monkeypatch.setattr(orchestrator, 'JOB_HISTORY', 2)
+    done = []
+    for _ in range(3):
+        job = orchestrator.ScrapeJob(['slow'])
+        job.finished = time.time()
+        orchestrator._jobs[job.id] = job
+        done.append(job)
+    running = [orchestrator.start() for _ in range(3)]
+    try:
+        # Only the two newest finished jobs are remembered, every running one is
+        assert [orchestrator.get(job.id) for job in running] == running
+        assert [orchestrator.get(job.id) for job in done] == [None, done[1], done[2]]
+    finally:
+        release.set()
+
+# ------------------ Ingest Tests ------------------
+def test_ingest_writes_in_process(client, monkeypatch):
+    def no_http(*args, **kwargs):
+        raise AssertionError("ingest went over HTTP")
+    monkeypatch.setattr(database.session, 'put', no_http)
+    report = database.ingest("organization", [{"name": "Chess Club"}, {"name": "Chess Club"}])
+    assert report['created'] == 1 and report['duplicate'] == 1
+    assert [org['name'] for org in client.get('/organization_list').json] == ["Chess Club"]
+
+def test_ingest_falls_back_to_http(monkeypatch):
+    sent = {}
+    class Response:
+        def json(self):
+            return {'created': 1, 'duplicate': 0, 'error': 0, 'results': []}
+    def put(url, json):
+        sent.update(url=url, rows=json)
+        return Response()
+    monkeypatch.delitem(sys.modules, 'database.serve_data')
+    monkeypatch.setattr(database.session, 'put', put)
+    assert database.ingest("organization", [{"name": "Chess Club"}])['created'] == 1
+    assert sent == {'url': database.BASE + "organization_bulk_add", 'rows': [{"name": "Chess Club"}]}
+
+# ------------------ Session Tests ------------------
+@pytest.fixture
+def flaky_server():
+    # Answers 503 to the first two requests, then 200, and tracks how many requests overlap
+    state = {'requests': 0, 'active': 0, 'peak': 0}
+    lock = threading.Lock()
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with lock:
+                state['requests'] += 1
+                state['active'] += 1
+                state['peak'] = max(state['peak'], state['active'])
+                status = 503 if state['requests'] <= 2 else 200
+            time.sleep(0.05)
+            self.send_response(status)
+            self.send_header('Content-Length', '2')
+            self.end_headers()
+            with lock:
+                state['active'] -= 1
+            self.wfile.write(b"ok")
+        def log_message(self, *args):
+            pass
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/", state
+    server.shutdown()
+
+def test_session_retries_transient_errors(flaky_server):
+    url, state = flaky_server
+    response = ScraperSession(backoff=0.01).get(url)
+    assert response.status_code == 200 and state['requests'] == 3
+
+def test_session_limits_requests_per_host(flaky_server):
+    url, state = flaky_server
+    state['requests'] = 2
+    session = ScraperSession(per_host=2)
+    with ThreadPoolExecutor(8) as pool:
+        assert all(r.status_code == 200 for r in pool.map(lambda _: session.get(url), range(8)))
+    assert state['peak'] <= 2
+
+# ------------------ Scraper Framework Tests ------------------
+class CountingScraper(Scraper):
+    name = "counting"
+    batch_size = 2
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.batches = []
+
+    async def fetch(self, client, run):
+        for page in self.pages:
+            if isinstance(page, Exception):
+                raise page
+            yield page
+
+    def parse(self, page, run):
+        return page
+
+    def map(self, item, run):
+        # Odd items are left out
+        return {'name': item} if item % 2 == 0 else None
+
+    def ingest(self, rows):
+        self.batches.append([row['name'] for row in rows])
+        return {'created': len(rows), 'results': [{'index': i, 'status': 'created'} for i in range(len(rows))]}
+
+def test_scraper_ingests_in_batches():
+    counting = CountingScraper([[0, 1, 2], [3, 4, 5, 6], [8]])
+    report = asyncio.run(counting.run(real_new_client(httpx.MockTransport(lambda request: httpx.Response(200)))))
+    assert counting.batches == [[0, 2], [4, 6], [8]]
+    assert report['created'] == 5
+    assert [result['index'] for result in report['results']] == [0, 1, 2, 3, 4]
+    assert CountingScraper([[0, 1, 2]]).scrape() == [{'name': 0}, {'name': 2}]
+
+def test_scraper_fetch_errors_stop_the_run():
+    counting = CountingScraper([[0, 2], ConnectionError("source down")])
+    with pytest.raises(ConnectionError):
+        counting.default()
+
+def test_scraper_client_retries_server_errors():
+    answers = [503, 502, 200]
+    def handler(request):
+        return httpx.Response(answers.pop(0))
+    async def get():
+        async with httpx.AsyncClient(transport=scraper.PoliteTransport(httpx.MockTransport(handler), backoff=0)) as client:
+            return await client.get("https://example.com/")
+    assert asyncio.run(get()).status_code == 200 and answers == []
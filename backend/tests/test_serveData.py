@@ -1,25 +1,16 @@
+import json
 import pytest
-from datetime import datetime
+from types import SimpleNamespace
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import create_engine, func, inspect, select, text
 from http import HTTPStatus
+from werkzeug.http import parse_date
 from database.serve_data import (
     app as flask_app, db, AcademicCalendar, InvolvementCenter, RebelCoverage,
-    UNLVCalendar, DupCheck
+    UNLVCalendar, Organization, DupCheck, month_range, during, ended, overlapping
 )
-
-# ------------------ Fixtures ------------------
-@pytest.fixture
-def app():
-    flask_app.config['TESTING'] = True
-    flask_app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
-    with flask_app.app_context():
-        db.drop_all()
-        db.create_all()
-    yield flask_app
-
-@pytest.fixture
-def client(app):
-    with app.test_client() as client:
-        yield client
+from database.dedup import row_key, existing_keys, insert_new
+from database import migrations, times
 
 # ------------------ User Tests ------------------
 def test_add_user(client):
@@ -188,6 +179,650 @@ def test_organization_delete_all_empty(client):
     res = client.delete('/organization_delete_all')
     assert res.status_code == HTTPStatus.OK
 
+# ------------------ Bulk Add Tests ------------------
+def test_bulk_add_reports_each_row(client):
+    client.put('/involvementcenter_add', json={
+        "name": "Existing Event", "startDate": "2025-04-01", "startTime": "2:00 PM",
+        "endDate": "2025-04-01", "endTime": "3:00 PM", "organization": "Tech Club"
+    })
+    event = {"startDate": "2025-04-02", "startTime": "6:00 PM", "endDate": "2025-04-02",
+             "endTime": "7:00 PM", "organization": "Tech Club"}
+    res = client.put('/involvementcenter_bulk_add', json=[
+        {**event, "name": "New Event"},
+        {**event, "name": "New Event"},
+        {**event, "name": "Existing Event", "startDate": "2025-04-01", "startTime": "2:00 PM"},
+        {"name": "Missing Fields"},
+        {**event, "name": "Bad Date", "startDate": "not a date"}
+    ])
+    assert res.status_code == HTTPStatus.OK
+    assert [r['status'] for r in res.json['results']] == ["created", "duplicate", "duplicate", "error", "error"]
+    assert (res.json['created'], res.json['duplicate'], res.json['error']) == (1, 2, 2)
+    event_id = res.json['results'][0]['id']
+    assert client.get(f'/involvementcenter_id/{event_id}').json['startTime'] == "6:00 PM"
+
+def test_bulk_add_organizations(client):
+    client.put('/organization_add', json={"name": "DupOrg"})
+    res = client.put('/organization_bulk_add', json=[{"name": "DupOrg"}, {"name": "NewOrg"}, {"name": "NewOrg"}])
+    assert [r['status'] for r in res.json['results']] == ["duplicate", "created", "duplicate"]
+    assert len(client.get('/organization_list').json) == 2
+
+def test_bulk_add_requires_array(client):
+    res = client.put('/academiccalendar_bulk_add', json={"name": "Not a list"})
+    assert res.status_code == HTTPStatus.BAD_REQUEST
+
+# ------------------ Dedup Tests ------------------
+def test_existing_keys_matches_whole_key(app):
+    with app.app_context():
+        day = datetime(2025, 4, 1).date()
+        db.session.add(InvolvementCenter(name="Club Fair", startDate=day, startTime="2:00 PM", endDate=day))
+        db.session.commit()
+        keys = [("Club Fair", day, "2:00 PM"), ("Club Fair", day, "3:00 PM")]
+        assert list(existing_keys(db.session, InvolvementCenter, keys)) == [("Club Fair", day, "2:00 PM")]
+
+def test_insert_new_skips_conflicts(app):
+    with app.app_context():
+        day = datetime(2025, 3, 17).date()
+        row = {"name": "Spring Break", "startDate": day, "endDate": day}
+        insert_new(db.session, AcademicCalendar, [row, dict(row, startTime="ignored")])
+        db.session.commit()
+        assert AcademicCalendar.query.count() == 1
+        assert row_key(AcademicCalendar, row) == ("Spring Break", day)
+
+# ------------------ Index Tests ------------------
+def query_plan(statement):
+    sql = str(statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+    return [row[-1] for row in db.session.execute(text("EXPLAIN QUERY PLAN " + sql))]
+
+@pytest.mark.parametrize("table_cls", [AcademicCalendar, InvolvementCenter, RebelCoverage, UNLVCalendar])
+def test_weekly_query_uses_span_index(app, table_cls):
+    with app.app_context():
+        day = datetime(2025, 4, 1).date()
+        plan = query_plan(during(table_cls, day, day + timedelta(days=7)).statement)
+        name = table_cls.__tablename__
+        assert f"SEARCH {name} USING INTEGER PRIMARY KEY (rowid=?)" in plan
+        assert any(step.startswith(f"SCAN {name}_span VIRTUAL TABLE INDEX ") for step in plan)
+
+@pytest.mark.parametrize("table_cls", [AcademicCalendar, InvolvementCenter, RebelCoverage, UNLVCalendar])
+def test_delete_past_uses_end_index(app, table_cls):
+    with app.app_context():
+        plan = query_plan(select(table_cls).filter(ended(table_cls)))
+        assert plan == [f"SEARCH {table_cls.__tablename__} USING INDEX ix_{table_cls.__tablename__}_end_at (endAt<?)"]
+
+def test_delete_past_keeps_running_events(client):
+    today = datetime.now().date()
+    for name, start, end in [("Finished", today - timedelta(days=3), today - timedelta(days=2)),
+                             ("Still running", today - timedelta(days=3), today + timedelta(days=2))]:
+        client.put('/involvementcenter_add', json={"name": name, "startDate": start.isoformat(), "startTime": "9:00 AM",
+                                                   "endDate": end.isoformat(), "endTime": "5:00 PM", "organization": "Tech Club"})
+    client.get('/involvementcenter_delete_past')
+    assert [e['name'] for e in client.get('/involvementcenter_list').json] == ["Still running"]
+
+# ------------------ Monthly Range Tests ------------------
+@pytest.mark.parametrize("month", ["2024-12", "2025-01", "2025-02"])
+def test_monthly_range_matches_strftime(app, month):
+    with app.app_context():
+        for day in ["2024-11-30", "2024-12-01", "2024-12-31", "2025-01-01", "2025-01-31", "2025-02-01", "2025-02-28", "2025-03-01"]:
+            date_obj = datetime.fromisoformat(day).date()
+            db.session.add(InvolvementCenter(name=f"Event {day}", startDate=date_obj, startTime="", endDate=date_obj))
+        db.session.commit()
+        start_date, end_date = month_range(month)
+        by_range = InvolvementCenter.query.filter(InvolvementCenter.startDate >= start_date, InvolvementCenter.startDate < end_date).all()
+        by_strftime = InvolvementCenter.query.filter(func.strftime("%Y-%m", InvolvementCenter.startDate) == month).all()
+        assert by_range and [e.id for e in by_range] == [e.id for e in by_strftime]
+
+def test_monthly_endpoint_uses_index(client):
+    client.put('/involvementcenter_add', json={
+        "name": "Month Event", "startDate": "2025-12-31", "startTime": "2:00 PM",
+        "endDate": "2025-12-31", "endTime": "3:00 PM", "organization": "Tech Club"
+    })
+    res = client.get('/involvementcenter_monthly/2025-12')
+    assert [e['name'] for e in res.json] == ["Month Event"]
+    assert client.get('/involvementcenter_monthly/2026-01').status_code == HTTPStatus.NOT_FOUND
+    assert client.get('/involvementcenter_monthly/2025-13').status_code == HTTPStatus.BAD_REQUEST
+    with flask_app.app_context():
+        plan = query_plan(during(InvolvementCenter, *month_range("2025-12")).statement)
+        assert "SEARCH involvement_center USING INTEGER PRIMARY KEY (rowid=?)" in plan
+        assert any(step.startswith("SCAN involvement_center_span VIRTUAL TABLE INDEX ") for step in plan)
+
+# ------------------ Events Feed Tests ------------------
+@pytest.fixture
+def feed_client(client):
+    client.put('/academiccalendar_add', json={
+        "name": "Spring Break", "startDate": "Monday, March 17, 2025", "endDate": "Monday, March 17, 2025"
+    })
+    for org, day in [("Tech Club", "2025-03-17"), ("Art Club", "2025-03-18"), ("Tech Club", "2025-04-01")]:
+        client.put('/involvementcenter_add', json={
+            "name": f"{org} Meeting", "startDate": day, "startTime": "2:00 PM",
+            "endDate": day, "endTime": "3:00 PM", "organization": org
+        })
+    client.put('/rebelcoverage_add', json={
+        "name": "Baseball vs. UNR", "startDate": "03/19/2025", "endDate": "03/19/2025",
+        "startTime": "6:00 PM", "sport": "Baseball"
+    })
+    return client
+
+def test_events_feed_returns_all_sources(feed_client):
+    res = feed_client.get('/events/weekly/2025-03-17')
+    assert res.status_code == HTTPStatus.OK
+    assert set(res.json) == {"academiccalendar", "involvementcenter", "rebelcoverage", "unlvcalendar"}
+    assert [e['name'] for e in res.json['involvementcenter']] == ["Tech Club Meeting", "Art Club Meeting"]
+    assert len(res.json['rebelcoverage']) == 1
+    assert res.json['unlvcalendar'] == []
+    daily = feed_client.get('/events/daily/2025-03-17').json
+    assert len(daily['academiccalendar']) == 1 and len(daily['involvementcenter']) == 1
+    monthly = feed_client.get('/events/monthly/2025-04').json
+    assert [e['name'] for e in monthly['involvementcenter']] == ["Tech Club Meeting"]
+
+def test_events_feed_filters(feed_client):
+    res = feed_client.get('/events/weekly/2025-03-17?sources=involvementcenter,rebelcoverage&organizations=Art Club&sports=Soccer')
+    assert set(res.json) == {"involvementcenter", "rebelcoverage"}
+    assert [e['organization'] for e in res.json['involvementcenter']] == ["Art Club"]
+    assert res.json['rebelcoverage'] == []
+
+def test_events_feed_bad_request(client):
+    assert client.get('/events/yearly/2025-03-17').status_code == HTTPStatus.BAD_REQUEST
+    assert client.get('/events/daily/03-17-2025').status_code == HTTPStatus.BAD_REQUEST
+    assert client.get('/events/daily/2025-03-17?sources=canvas').status_code == HTTPStatus.BAD_REQUEST
+
+def test_range_endpoints_filter_preferences(feed_client):
+    res = feed_client.get('/involvementcenter_weekly/2025-03-17?organizations=Art Club&organizations=Chess Club')
+    assert [e['organization'] for e in res.json] == ["Art Club"]
+    res = feed_client.get('/involvementcenter_monthly/2025-03?organizations=Tech Club')
+    assert [e['name'] for e in res.json] == ["Tech Club Meeting"]
+    assert feed_client.get('/involvementcenter_list?organizations=').status_code == HTTPStatus.NOT_FOUND
+    assert len(feed_client.get('/rebelcoverage_weekly/2025-03-17?sports=Baseball').json) == 1
+    assert feed_client.get('/rebelcoverage_weekly/2025-03-17?sports=Soccer').status_code == HTTPStatus.NOT_FOUND
+
+# ------------------ Conditional GET Tests ------------------
+def test_list_answers_if_none_match(client):
+    client.put('/organization_add', json={"name": "Cool Org"})
+    first = client.get('/organization_list')
+    etag = first.headers['ETag']
+    assert first.headers['Last-Modified']
+    cached = client.get('/organization_list', headers={'If-None-Match': etag})
+    assert cached.status_code == HTTPStatus.NOT_MODIFIED
+    assert cached.headers['ETag'] == etag
+    client.put('/organization_add', json={"name": "Cooler Org"})
+    changed = client.get('/organization_list', headers={'If-None-Match': etag})
+    assert changed.status_code == HTTPStatus.OK
+    assert changed.headers['ETag'] != etag and len(changed.json) == 2
+
+def test_feed_answers_if_modified_since(feed_client):
+    first = feed_client.get('/events/daily/2025-03-17')
+    since = {'If-Modified-Since': first.headers['Last-Modified']}
+    assert feed_client.get('/events/daily/2025-03-17', headers=since).status_code == HTTPStatus.NOT_MODIFIED
+    # A matching If-Modified-Since does not win over a stale ETag
+    stale = {'If-None-Match': '"stale"', **since}
+    assert feed_client.get('/events/daily/2025-03-17', headers=stale).status_code == HTTPStatus.OK
+    # A change in the same second still moves Last-Modified on
+    feed_client.delete('/academiccalendar_delete_all')
+    changed = feed_client.get('/events/daily/2025-03-17', headers=since)
+    assert changed.status_code == HTTPStatus.OK
+    assert parse_date(changed.headers['Last-Modified']) > parse_date(since['If-Modified-Since'])
+    # A change to any of the feed's tables gives it a new ETag
+    feed_client.delete('/rebelcoverage_delete_all')
+    etag = {'If-None-Match': first.headers['ETag']}
+    assert feed_client.get('/events/daily/2025-03-17', headers=etag).status_code == HTTPStatus.OK
+
+def test_table_versions_never_share_a_second(monkeypatch):
+    from database import cache
+    monkeypatch.setattr(cache.time, 'time', lambda: 1000.5)
+    versions = cache.TableVersions()
+    assert versions.last_modified(['t']) == 1000
+    versions.bump('t')
+    versions.bump('u')
+    # Two changes within one second still get two later Last-Modified seconds,
+    # so a feed over both tables moves on too
+    assert versions.version('t') == (1, 1001) and versions.version('u') == (1, 1002)
+    assert versions.last_modified(['t', 'u']) == 1002
+
+# ------------------ Response Cache Tests ------------------
+def test_response_cache_hits_until_table_changes(feed_client):
+    before = feed_client.get('/cache_stats').json
+    first = feed_client.get('/events/weekly/2025-03-17?organizations=Tech Club')
+    second = feed_client.get('/events/weekly/2025-03-17?organizations=Tech Club')
+    assert second.get_data() == first.get_data()
+    after = feed_client.get('/cache_stats').json
+    assert (after['misses'] - before['misses'], after['hits'] - before['hits']) == (1, 1)
+    feed_client.put('/involvementcenter_add', json={
+        "name": "Late Addition", "startDate": "2025-03-19", "startTime": "1:00 PM",
+        "endDate": "2025-03-19", "endTime": "2:00 PM", "organization": "Tech Club"
+    })
+    third = feed_client.get('/events/weekly/2025-03-17?organizations=Tech Club')
+    assert "Late Addition" in [e['name'] for e in third.json['involvementcenter']]
+    assert feed_client.get('/cache_stats').json['hits'] == after['hits']
+
+def test_response_cache_evicts_least_recent():
+    from database.cache import ResponseCache
+    cache = ResponseCache(max_entries=2, ttl=60)
+    cache.put('/a', 'v1', ['t'], b'a', 200)
+    cache.put('/b', 'v1', ['t'], b'b', 200)
+    assert cache.get('/a', 'v1') == (b'a', 200)
+    cache.put('/c', 'v1', ['u'], b'c', 200)
+    assert cache.get('/b', 'v1') is None
+    assert cache.get('/a', 'v2') is None
+    cache.invalidate('u')
+    assert cache.stats()['entries'] == 0
+
+# ------------------ Pagination Tests ------------------
+def test_list_pages_with_cursor(client):
+    client.put('/involvementcenter_bulk_add', json=[{
+        "name": f"Event {i}", "startDate": f"2025-04-0{1 + i % 3}", "startTime": "2:00 PM",
+        "endDate": "2025-04-01", "endTime": "3:00 PM", "organization": "Tech Club"
+    } for i in range(7)])
+    full = client.get('/involvementcenter_list').json
+    assert isinstance(full, list) and len(full) == 7
+    names, cursor, pages = [], None, 0
+    while True:
+        res = client.get('/involvementcenter_list', query_string={'limit': 3, **({'after': cursor} if cursor else {})})
+        assert res.status_code == HTTPStatus.OK
+        names += [e['name'] for e in res.json['items']]
+        cursor, pages = res.json['next'], pages + 1
+        if not cursor:
+            break
+    assert pages == 3
+    assert sorted(names) == sorted(e['name'] for e in full) and len(set(names)) == 7
+    assert [e['startDate'] for e in full] == sorted(e['startDate'] for e in full)
+
+def test_organization_list_pages(client):
+    client.put('/organization_bulk_add', json=[{"name": name} for name in ["Chess, Go and More", "Art Club", "Dance Team"]])
+    first = client.get('/organization_list?limit=2').json
+    assert [o['name'] for o in first['items']] == ["Art Club", "Chess, Go and More"]
+    second = client.get('/organization_list', query_string={'limit': 2, 'after': first['next']}).json
+    assert [o['name'] for o in second['items']] == ["Dance Team"] and second['next'] is None
+
+def test_user_list_pages_past_comma_in_name(client):
+    for first, nshe in [("Ann, Jr", "1000000001"), ("Ann", "1000000002"), ("Bob", "1000000003")]:
+        client.put('/user_add', json={"first_name": first, "last_name": "Lee", "nshe": nshe})
+    first = client.get('/user_list?limit=2').json
+    assert [u['first_name'] for u in first['items']] == ["Ann", "Ann, Jr"]
+    second = client.get('/user_list', query_string={'limit': 2, 'after': first['next']})
+    assert second.status_code == HTTPStatus.OK
+    assert [u['first_name'] for u in second.json['items']] == ["Bob"] and second.json['next'] is None
+
+def test_list_page_bad_arguments(client):
+    assert client.get('/academiccalendar_list?limit=0').status_code == HTTPStatus.BAD_REQUEST
+    for cursor in ["yesterday", "2025-04-01,17", "WyIyMDI1LTA0LTAxIl0", "WyJub3QgYSBkYXRlIiwgMV0", "WyIyMDI1LTA0LTAxIiwgIjE3Il0"]:
+        # Not base64 JSON, plain text, too short, not a date, id as a string
+        assert client.get('/academiccalendar_list', query_string={'after': cursor}).status_code == HTTPStatus.BAD_REQUEST
+    assert client.get('/academiccalendar_list?limit=5').json == {'items': [], 'next': None}
+
+# ------------------ Export Tests ------------------
+def test_export_streams_ndjson(client):
+    client.put('/organization_bulk_add', json=[{"name": f"Org {i}"} for i in range(5)])
+    res = client.get('/export/organization.ndjson', buffered=False)
+    assert res.status_code == HTTPStatus.OK
+    assert res.is_streamed and res.mimetype == 'application/x-ndjson'
+    rows = [json.loads(line) for line in res.get_data(as_text=True).splitlines()]
+    assert [row['name'] for row in rows] == [f"Org {i}" for i in range(5)]
+    assert client.get('/export/user.ndjson').status_code == HTTPStatus.NOT_FOUND
+
+# ------------------ Upsert Tests ------------------
+def rc_row(source_id, startTime="7:00 PM", location="Las Vegas Ballpark"):
+    return {"name": "Baseball vs. Fresno State", "startDate": "04/05/2025", "endDate": "04/05/2025", "startTime": startTime,
+            "location": location, "sport": "Baseball", "link": source_id, "source_id": source_id}
+
+def test_upsert_updates_changed_rows(client):
+    link = "https://unlvrebels.com/game/1"
+    report = client.put('/rebelcoverage_bulk_upsert', json=[rc_row(link), rc_row(link)]).json
+    assert (report['created'], report['duplicate']) == (1, 1)
+    event_id = report['results'][0]['id']
+
+    assert client.put('/rebelcoverage_bulk_upsert', json=[rc_row(link)]).json['unchanged'] == 1
+    # Rescheduled: same source id, new start time, updated in place rather than added
+    report = client.put('/rebelcoverage_bulk_upsert', json=[rc_row(link, startTime="6:00 PM", location="Wilson Field")]).json
+    assert report['updated'] == 1 and report['results'][0]['id'] == event_id
+    rows = client.get('/rebelcoverage_list').json
+    assert [(row['startTime'], row['location']) for row in rows] == [("6:00 PM", "Wilson Field")]
+
+def test_upsert_adopts_rows_without_source_id(client):
+    row = rc_row("https://unlvrebels.com/game/1")
+    client.put('/rebelcoverage_bulk_add', json=[dict(row, source_id=None)])
+    report = client.put('/rebelcoverage_bulk_upsert', json=[row]).json
+    assert report['updated'] == 1
+    # Another listing with the same name and start is not merged into it
+    report = client.put('/rebelcoverage_bulk_upsert', json=[rc_row("https://unlvrebels.com/game/2")]).json
+    assert report['duplicate'] == 1
+    assert client.put('/organization_bulk_upsert', json=[]).status_code == HTTPStatus.NOT_FOUND
+
+def test_upsert_reports_update_onto_another_event(client):
+    client.put('/rebelcoverage_bulk_upsert', json=[rc_row("https://unlvrebels.com/game/1"),
+                                                   rc_row("https://unlvrebels.com/game/2", startTime="4:00 PM")])
+    # Game 2 moves onto game 1's start, the rest of the batch still goes in
+    report = client.put('/rebelcoverage_bulk_upsert', json=[rc_row("https://unlvrebels.com/game/2"),
+                                                            dict(rc_row("https://unlvrebels.com/game/3"), name="Softball vs. UNR")]).json
+    assert [r['status'] for r in report['results']] == ["conflict", "created"]
+    assert (report['conflict'], report['created']) == (1, 1)
+    assert sorted(row['startTime'] for row in client.get('/rebelcoverage_list').json) == ["4:00 PM", "7:00 PM", "7:00 PM"]
+
+def test_upsert_new_row_takes_key_of_moved_event(client):
+    client.put('/rebelcoverage_bulk_upsert', json=[rc_row("https://unlvrebels.com/game/1")])
+    report = client.put('/rebelcoverage_bulk_upsert', json=[rc_row("https://unlvrebels.com/game/2"),
+                                                            rc_row("https://unlvrebels.com/game/1", startTime="1:00 PM")]).json
+    assert [r['status'] for r in report['results']] == ["created", "updated"]
+    rows = client.get('/rebelcoverage_list').json
+    assert sorted((row['source_id'] if 'source_id' in row else row['link'], row['startTime']) for row in rows) == [
+        ("https://unlvrebels.com/game/1", "1:00 PM"), ("https://unlvrebels.com/game/2", "7:00 PM")]
+
+def test_upsert_commits_batch_once(client):
+    # What pysqlite really sends, including any transaction statements of its own
+    statements = []
+    def trace(dbapi_connection, connection_record):
+        dbapi_connection.set_trace_callback(statements.append)
+    with flask_app.app_context():
+        db.engine.dispose()
+        db.event.listen(db.engine, 'connect', trace)
+        try:
+            rows = [dict(rc_row(f"https://unlvrebels.com/game/{i}"), name=f"Game {i}") for i in range(3)]
+            assert client.put('/rebelcoverage_bulk_upsert', json=rows).json['created'] == 3
+            # Game 2 moving onto game 1 sends the batch down the savepoint per row path
+            rows = [dict(rows[2], name="Game 1"), dict(rc_row("https://unlvrebels.com/game/3"), name="Game 3")]
+            assert [r['status'] for r in client.put('/rebelcoverage_bulk_upsert', json=rows).json['results']] == ["conflict", "created"]
+        finally:
+            db.event.remove(db.engine, 'connect', trace)
+            db.engine.dispose()
+    assert [s for s in statements if s in ('BEGIN', 'COMMIT', 'ROLLBACK')] == ['BEGIN', 'COMMIT', 'BEGIN', 'COMMIT']
+    # One for the first batch; the second tries the batch, each row, then the conflict again
+    assert sum(s.startswith('SAVEPOINT') for s in statements) == 1 + 1 + 2 + 1
+
+def test_upsert_source_listed_on_several_dates(client):
+    link = "https://www.unlv.edu/event/open-house"
+    rows = [{"name": "Open House", "startDate": day, "endDate": day, "startTime": "10:00 AM", "link": link, "source_id": link}
+            for day in ("Friday, April 4, 2025", "Friday, April 11, 2025")]
+    report = client.put('/unlvcalendar_bulk_upsert', json=rows).json
+    assert report['created'] == 2
+    assert client.put('/unlvcalendar_bulk_upsert', json=rows).json['unchanged'] == 2
+
+def test_upsert_moves_rescheduled_event(client):
+    event = {"name": "Hackathon", "startDate": "2025-04-01", "startTime": "6:00 PM", "endDate": "2025-04-01",
+             "endTime": "9:00 PM", "organization": "Tech Club", "source_id": "123"}
+    assert client.put('/involvementcenter_bulk_upsert', json=[event]).json['created'] == 1
+    moved = dict(event, startDate="2025-04-03", endDate="2025-04-03")
+    report = client.put('/involvementcenter_bulk_upsert', json=[moved]).json
+    assert [r['status'] for r in report['results']] == ["updated"]
+    assert [e['startDate'] for e in client.get('/involvementcenter_list').json] == ["2025-04-03"]
+
+def test_upgrade_keeps_newest_row_per_source(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        db.metadata.create_all(connection)
+        # Stored twice under the old per-date index
+        connection.execute(text("DROP INDEX uq_involvement_center_source_id"))
+        connection.execute(text('CREATE UNIQUE INDEX uq_involvement_center_source_start ON involvement_center '
+                                '(source_id, "startDate") WHERE source_id IS NOT NULL'))
+        connection.execute(text('INSERT INTO involvement_center (name, "startDate", "startTime", "endDate", source_id) VALUES '
+                                "('Hackathon', '2025-04-01', '6:00 PM', '2025-04-01', '123'), "
+                                "('Hackathon', '2025-04-03', '6:00 PM', '2025-04-03', '123')"))
+        migrations.drop_retired_indexes(connection, db.metadata)
+        migrations.create_indexes(connection, db.metadata)
+        assert connection.execute(text('SELECT "startDate" FROM involvement_center')).scalars().all() == ["2025-04-03"]
+    engine.dispose()
+
+def test_upgrade_adds_source_id_column(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        db.metadata.create_all(connection)
+        connection.execute(text("DROP TABLE rebel_coverage"))
+        connection.execute(text('CREATE TABLE rebel_coverage (id INTEGER PRIMARY KEY, name VARCHAR(500) NOT NULL, '
+                                '"startDate" DATE NOT NULL, "startTime" VARCHAR(100), "endDate" DATE NOT NULL, '
+                                '"endTime" VARCHAR(100), location VARCHAR(100), sport VARCHAR(100), link VARCHAR(100))'))
+        connection.execute(text("INSERT INTO rebel_coverage (name, \"startDate\", \"startTime\", \"endDate\") VALUES "
+                                "('Game 1', '2025-04-05', '19:00', '2025-04-05'), ('Game 2', '2025-04-06', '19:00', '2025-04-06')"))
+        connection.execute(text("CREATE INDEX ix_rebel_coverage_retired ON rebel_coverage (name)"))
+        migrations.add_columns(connection, db.metadata)
+        migrations.drop_retired_indexes(connection, db.metadata)
+        migrations.create_indexes(connection, db.metadata)
+        assert 'source_id' in {column['name'] for column in inspect(connection).get_columns('rebel_coverage')}
+        indexes = {index['name'] for index in inspect(connection).get_indexes('rebel_coverage')}
+        assert 'uq_rebel_coverage_source_id' in indexes and 'ix_rebel_coverage_retired' not in indexes
+        # Rows without a source id are not duplicates of each other
+        assert connection.execute(text("SELECT COUNT(*) FROM rebel_coverage")).scalar() == 2
+    engine.dispose()
+
+# ------------------ Time Normalization Tests ------------------
+@pytest.mark.parametrize("raw, minutes, display", [
+    ("8:30 pm", 20 * 60 + 30, "8:30 PM"),
+    ("17:15:00", 17 * 60 + 15, "5:15 PM"),
+    ("00:30:00", 30, "12:30 AM"),
+    ("7PM", 19 * 60, "7:00 PM"),
+    ("11 a.m.", 11 * 60, "11:00 AM"),
+    ("12:00 AM", 0, "12:00 AM"),
+    ("noon", 12 * 60, "12:00 PM"),
+    ("6:00 PM - 8:00 PM", 18 * 60, "6:00 PM"),
+    ("6 - 8 PM", 18 * 60, "6:00 PM"),
+    ("Room 101, 7 PM", 19 * 60, "7:00 PM"),
+    ("All Day", None, "ALL DAY"),
+    ("TBA", None, "TBA"),
+    ("", None, ""),
+    (None, None, ""),
+])
+def test_parse_time(raw, minutes, display):
+    assert times.parse_time(raw) == (minutes, display)
+
+def test_parse_time_is_memoized():
+    times.parse_time.cache_clear()
+    times.parse_time("9:45 am")
+    times.parse_time("9:45 am")
+    assert times.parse_time.cache_info().hits == 1
+
+def test_ingest_stores_normalized_times(client):
+    client.put('/involvementcenter_bulk_add', json=[{
+        "name": "Hack Night", "startDate": "2025-04-01", "startTime": "17:15:00",
+        "endDate": "2025-04-01", "endTime": "9 pm", "organization": "Tech Club"
+    }])
+    event = client.get('/involvementcenter_list').json[0]
+    assert (event['startTime'], event['endTime']) == ("5:15 PM", "9:00 PM")
+
+# ------------------ Event Time Column Tests ------------------
+def test_ingest_fills_utc_times(client):
+    client.put('/involvementcenter_bulk_add', json=[
+        {"name": name, "startDate": "2025-04-01", "startTime": start, "endDate": "2025-04-01",
+         "endTime": end, "organization": "Tech Club"}
+        for name, start, end in [("Late Show", "10:00 PM", "1:00 AM"), ("Breakfast", "8 am", "9 am"), ("Fair", "All Day", "")]
+    ])
+    events = client.get('/involvementcenter_daily/2025-04-01').json
+    # Sorted by start time within the day, not by insertion
+    assert [(e['name'], e['startTime'], e['startAt'], e['endAt']) for e in events] == [
+        ("Fair", "ALL DAY", "2025-04-01T07:00:00+00:00", "2025-04-02T07:00:00+00:00"),
+        ("Breakfast", "8:00 AM", "2025-04-01T15:00:00+00:00", "2025-04-01T16:00:00+00:00"),
+        ("Late Show", "10:00 PM", "2025-04-02T05:00:00+00:00", "2025-04-02T08:00:00+00:00"),
+    ]
+
+def test_range_endpoint_uses_span_index(client):
+    with flask_app.app_context():
+        query = during(UNLVCalendar, datetime(2025, 4, 1).date(), datetime(2025, 4, 8).date())
+        sql = str(query.statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+        plan = " ".join(row[-1] for row in db.session.execute(text("EXPLAIN QUERY PLAN " + sql)))
+        assert "SCAN unlv_calendar_span VIRTUAL TABLE" in plan
+
+def test_upgrade_fills_utc_times(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        db.metadata.create_all(connection)
+        connection.execute(text("DROP TABLE unlv_calendar"))
+        connection.execute(text('CREATE TABLE unlv_calendar (id INTEGER PRIMARY KEY, name VARCHAR(500) NOT NULL, '
+                                '"startDate" DATE NOT NULL, "startTime" VARCHAR(100), "endDate" DATE NOT NULL, '
+                                '"endTime" VARCHAR(100), location VARCHAR(100), category VARCHAR(100), link VARCHAR(100))'))
+        connection.execute(text("INSERT INTO unlv_calendar (name, \"startDate\", \"startTime\", \"endDate\", \"endTime\") "
+                                "VALUES ('Concert', '2025-07-04', '7:30 PM', '2025-07-04', '9:00 PM')"))
+        migrations.add_columns(connection, db.metadata)
+        migrations.fill_times(connection, db.metadata)
+        migrations.create_indexes(connection, db.metadata)
+        row = connection.execute(text('SELECT "startAt", "endAt" FROM unlv_calendar')).one()
+        assert tuple(row) == ("2025-07-05 02:30:00.000000", "2025-07-05 04:00:00.000000")
+    engine.dispose()
+
+def test_upgrade_normalizes_old_times(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        db.metadata.create_all(connection)
+        # As the old format_time stored them, the second Club Fair is a re-scrape of the first
+        for name, start_time, end_time in [("Club Fair", "10:00", "NOON"), ("Club Fair", "10:00 AM", "12:00 PM"),
+                                           ("Late Show", "21:30", "MIDNIGHT"), ("Open House", "ALL DAY", None)]:
+            connection.execute(text('INSERT INTO involvement_center (name, "startDate", "startTime", "endDate", "endTime") '
+                                    "VALUES (:name, '2025-04-01', :start, '2025-04-01', :end)"),
+                               {'name': name, 'start': start_time, 'end': end_time})
+    migrations.upgrade(SimpleNamespace(engine=engine, metadata=db.metadata, Model=db.Model))
+    with engine.connect() as connection:
+        rows = connection.execute(text('SELECT name, "startTime", "endTime", "startAt" FROM involvement_center ORDER BY id')).all()
+    assert [tuple(row[:3]) for row in rows] == [("Club Fair", "10:00 AM", "12:00 PM"), ("Late Show", "9:30 PM", "12:00 AM"),
+                                                 ("Open House", "ALL DAY", None)]
+    assert rows[1].startAt == "2025-04-02 04:30:00.000000"
+    engine.dispose()
+
+# ------------------ Upcoming Events Tests ------------------
+@pytest.fixture
+def upcoming_client(client, monkeypatch):
+    # 2025-04-01 6:30 PM in Las Vegas
+    monkeypatch.setattr('database.serve_data.utc_now', lambda: datetime(2025, 4, 2, 1, 30, tzinfo=timezone.utc))
+    client.put('/academiccalendar_add', json={
+        "name": "Spring Break", "startDate": "Monday, March 31, 2025", "endDate": "Sunday, April 6, 2025"
+    })
+    for name, start, end, org in [("Study Hall", "5:00 PM", "7:00 PM", "Tech Club"), ("Lunch Social", "12:00 PM", "1:00 PM", "Tech Club"),
+                                  ("Film Night", "8:00 PM", "10:00 PM", "Art Club"), ("Late Show", "11:00 PM", "11:30 PM", "Art Club")]:
+        client.put('/involvementcenter_add', json={
+            "name": name, "startDate": "2025-04-01", "startTime": start,
+            "endDate": "2025-04-01", "endTime": end, "organization": org
+        })
+    client.put('/rebelcoverage_add', json={
+        "name": "Baseball vs. UNR", "startDate": "04/01/2025", "endDate": "04/01/2025",
+        "startTime": "7:00 PM", "endTime": "10:00 PM", "sport": "Baseball"
+    })
+    return client
+
+def test_upcoming_merges_sources_in_start_order(upcoming_client):
+    res = upcoming_client.get('/events/upcoming?hours=2')
+    assert res.status_code == HTTPStatus.OK
+    assert res.json['start'] == "2025-04-02T01:30:00+00:00" and res.json['end'] == "2025-04-02T03:30:00+00:00"
+    # The week-long break started days ago but is still running
+    assert [(e['source'], e['name']) for e in res.json['events']] == [
+        ("academiccalendar", "Spring Break"),
+        ("involvementcenter", "Study Hall"),
+        ("rebelcoverage", "Baseball vs. UNR"),
+        ("involvementcenter", "Film Night"),
+    ]
+    default = upcoming_client.get('/events/upcoming').json['events']
+    assert [e['name'] for e in default] == [e['name'] for e in res.json['events']]
+
+def test_upcoming_filters(upcoming_client):
+    res = upcoming_client.get('/events/upcoming?hours=6&sources=involvementcenter&organizations=Art Club')
+    assert [e['name'] for e in res.json['events']] == ["Film Night", "Late Show"]
+    assert upcoming_client.get('/events/upcoming?hours=0').status_code == HTTPStatus.BAD_REQUEST
+    assert upcoming_client.get('/events/upcoming?hours=soon').status_code == HTTPStatus.BAD_REQUEST
+    assert upcoming_client.get('/events/upcoming?sources=canvas').status_code == HTTPStatus.BAD_REQUEST
+
+def test_upcoming_query_uses_span_index(client):
+    with flask_app.app_context():
+        now = datetime(2025, 4, 2, 1, 30, tzinfo=timezone.utc)
+        query = overlapping(InvolvementCenter, now, now + timedelta(hours=2))
+        sql = str(query.statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+        plan = " ".join(row[-1] for row in db.session.execute(text("EXPLAIN QUERY PLAN " + sql)))
+        assert "SCAN involvement_center_span VIRTUAL TABLE" in plan
+
+# ------------------ Overlap Tests ------------------
+def test_multi_day_events_show_on_every_day(client):
+    client.put('/academiccalendar_add', json={
+        "name": "Spring Break", "startDate": "Monday, March 17, 2025", "endDate": "Sunday, March 23, 2025"
+    })
+    client.put('/involvementcenter_add', json={
+        "name": "Hackathon", "startDate": "2025-03-21", "startTime": "6:00 PM",
+        "endDate": "2025-03-23", "endTime": "2:00 PM", "organization": "Tech Club"
+    })
+    assert [e['name'] for e in client.get('/academiccalendar_daily/2025-03-20').json] == ["Spring Break"]
+    assert client.get('/academiccalendar_daily/2025-03-24').status_code == HTTPStatus.NOT_FOUND
+    assert [e['name'] for e in client.get('/involvementcenter_weekly/2025-03-22').json] == ["Hackathon"]
+    feed = client.get('/events/daily/2025-03-22').json
+    assert [e['name'] for e in feed['academiccalendar']] == ["Spring Break"]
+    assert [e['name'] for e in feed['involvementcenter']] == ["Hackathon"]
+    assert client.get('/events/daily/2025-03-24').json['involvementcenter'] == []
+    assert [e['name'] for e in client.get('/academiccalendar_monthly/2025-03').json] == ["Spring Break"]
+
+def test_span_index_follows_the_table(client):
+    client.put('/rebelcoverage_bulk_upsert', json=[rc_row("https://unlvrebels.com/game/1")])
+    assert len(client.get('/rebelcoverage_daily/2025-04-05').json) == 1
+    assert client.get('/rebelcoverage_daily/2025-04-06').status_code == HTTPStatus.NOT_FOUND
+    # Stretching the game past midnight stretches it in the R*Tree too
+    client.put('/rebelcoverage_bulk_upsert', json=[dict(rc_row("https://unlvrebels.com/game/1"), endDate="04/06/2025", endTime="1:00 AM")])
+    assert len(client.get('/rebelcoverage_daily/2025-04-06').json) == 1
+    client.delete('/rebelcoverage_delete_all')
+    with flask_app.app_context():
+        assert db.session.execute(text("SELECT COUNT(*) FROM rebel_coverage_span")).scalar() == 0
+
+def test_upgrade_builds_span_index(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        db.metadata.create_all(connection)
+        migrations.drop_span_index(connection, InvolvementCenter.__table__)
+        connection.execute(text("INSERT INTO involvement_center (name, \"startDate\", \"endDate\", \"startAt\", \"endAt\") VALUES "
+                                "('Hackathon', '2025-03-21', '2025-03-23', '2025-03-22 01:00:00.000000', '2025-03-23 21:00:00.000000')"))
+        migrations.create_span_indexes(connection, db.metadata)
+        spans = connection.execute(text("SELECT * FROM involvement_center_span")).all()
+        assert [tuple(row) for row in spans] == [(1, 29043420, 29046060)]
+    engine.dispose()
+
+# ------------------ Search Tests ------------------
+@pytest.fixture
+def search_client(client):
+    client.put('/academiccalendar_add', json={
+        "name": "Spring Break", "startDate": "Monday, March 17, 2025", "endDate": "Sunday, March 23, 2025"
+    })
+    client.put('/involvementcenter_bulk_add', json=[
+        {"name": name, "startDate": day, "startTime": "2:00 PM", "endDate": day, "endTime": "3:00 PM",
+         "location": location, "organization": org}
+        for name, day, location, org in [
+            ("Chess Tournament", "2025-03-18", "Student Union", "Chess Club"),
+            ("Weekly Meeting", "2025-04-02", "Café Rebel", "Chess Club"),
+            ("Spring Career Fair", "2025-04-10", "Cox Pavilion", "Career Services"),
+        ]
+    ])
+    client.put('/organization_bulk_add', json=[{"name": "Chess Club"}, {"name": "Chemistry Society"}])
+    return client
+
+def test_search_ranks_name_matches_first(search_client):
+    res = search_client.get('/events/search?q=chess')
+    assert res.status_code == HTTPStatus.OK
+    names = [(e['source'], e['name']) for e in res.json['results']]
+    # A match in the name outranks a match in the organization
+    assert names.index(("involvementcenter", "Chess Tournament")) < names.index(("involvementcenter", "Weekly Meeting"))
+    assert set(names) == {("involvementcenter", "Chess Tournament"), ("involvementcenter", "Weekly Meeting"),
+                          ("organization", "Chess Club")}
+
+def test_search_prefix_and_accents(search_client):
+    assert {e['name'] for e in search_client.get('/events/search?q=che').json['results']} == {
+        "Chess Tournament", "Weekly Meeting", "Chess Club", "Chemistry Society"}
+    assert [e['name'] for e in search_client.get('/events/search?q=cafe').json['results']] == ["Weekly Meeting"]
+    assert [e['name'] for e in search_client.get('/events/search?q=spring fa').json['results']] == ["Spring Career Fair"]
+
+def test_search_date_range_and_sources(search_client):
+    res = search_client.get('/events/search?q=spring&from=2025-03-20&to=2025-03-31')
+    # The break started before the range but runs into it; organizations have no dates
+    assert [(e['source'], e['name']) for e in res.json['results']] == [("academiccalendar", "Spring Break")]
+    res = search_client.get('/events/search?q=chess&sources=organization')
+    assert [e['name'] for e in res.json['results']] == ["Chess Club"]
+    assert search_client.get('/events/search?q=chess&limit=1').json['results'][0]['name'] == "Chess Tournament"
+    assert search_client.get('/events/search?q=*"').status_code == HTTPStatus.BAD_REQUEST
+    assert search_client.get('/events/search?q=chess&from=March').status_code == HTTPStatus.BAD_REQUEST
+
+def test_search_index_follows_the_table(client):
+    client.put('/rebelcoverage_bulk_upsert', json=[rc_row("https://unlvrebels.com/game/1")])
+    assert len(client.get('/events/search?q=ballpark').json['results']) == 1
+    client.put('/rebelcoverage_bulk_upsert', json=[rc_row("https://unlvrebels.com/game/1", location="Wilson Field")])
+    assert client.get('/events/search?q=ballpark').json['results'] == []
+    assert len(client.get('/events/search?q=wilson').json['results']) == 1
+    client.delete('/rebelcoverage_delete_all')
+    assert client.get('/events/search?q=baseball').json['results'] == []
+
+def test_upgrade_builds_search_index(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        db.metadata.create_all(connection)
+        migrations.drop_search_index(connection, Organization.__table__)
+        connection.execute(text("INSERT INTO organization (name) VALUES ('Chess Club'), ('Rock Climbing Club')"))
+        migrations.create_search_indexes(connection, [Organization])
+        found = connection.execute(text("SELECT name FROM organization_search WHERE organization_search MATCH 'climb*'")).all()
+        assert [row[0] for row in found] == ["Rock Climbing Club"]
+    engine.dispose()
+
 # ------------------ DupCheck Tests ------------------
 @pytest.mark.parametrize("table_cls, startDate, endDate, name, startTime, is_dup", [
     (AcademicCalendar, "Monday, March 17, 2025", "Monday, March 17, 2025", "Spring Break", "", True),
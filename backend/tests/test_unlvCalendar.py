@@ -2,6 +2,8 @@ import unittest
 import os
 from http import HTTPStatus
 import time
+import pytest
+from webscraping import parsing, unlv_calendar
 from webscraping.unlv_calendar import scrape
 from database.serve_data import app as flask_app, db
 
@@ -164,6 +166,30 @@ class TestUCScraperAPI(unittest.TestCase):
             except Exception as e:
                 print(f"Could not delete {db_path}: {e}")
 
+# ------------------ HTML Parsing Tests ------------------
+UNLV_CALENDAR_PAGE = """<div class="container">
+<div class="card"><div class="card-header">Friday, April 4, 2025</div><div class="card-body">
+  <div class="row"><div class="col-sm-10"><a href="/event/1">Poetry Slam</a></div>
+  <div class="col-sm-2">6:00 PM</div><div class="col-sm-12 text-sm">Student Union</div></div>
+  <div class="row"><div class="col-sm-10">Open Mic</div></div>
+</div></div>
+<div class="card"><div class="card-header">Saturday, April 5, 2025</div><div class="card-body">
+  <div class="row"><div class="col-sm-10"><a href="/event/2">Farmers Market</a></div></div>
+</div></div></div>"""
+
+@pytest.mark.parametrize("parser", ["html.parser", "lxml"])
+def test_unlv_calendar_single_pass_parse(monkeypatch, parser):
+    if parser == "lxml":
+        pytest.importorskip("lxml")
+    monkeypatch.setattr(parsing, 'PARSER', parser)
+    events = unlv_calendar.parse(UNLV_CALENDAR_PAGE)
+    assert [(e['name'], e['startDate'], e['startTime'], e['location'], e['source_id']) for e in events] == [
+        ("Poetry Slam", "Friday, April 4, 2025", "6:00 PM", "Student Union", "https://www.unlv.edu/event/1"),
+        ("No Title", "Friday, April 4, 2025", "No Time", "No Location", None),
+        ("Farmers Market", "Saturday, April 5, 2025", "No Time", "No Location", "https://www.unlv.edu/event/2"),
+    ]
+
+
 if __name__ == '__main__':
     # Ensure the script using this test class is run directly
     unittest.main()
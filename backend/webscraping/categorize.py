@@ -0,0 +1,216 @@
+"""
+Interest categories for event titles
+
+Titles are first run through LocalClassifier: keyword rules, then TF-IDF
+similarity to titles that already have a category (model answers in the
+cache and categorized UNLVCalendar rows). Only titles it is unsure about are
+sent to the model, in batches of BATCH_SIZE, WORKERS batches at a time.
+Every valid model answer, including "no category fits", is kept in the
+scraper state directory, so rerunning a scrape over the same events makes no
+model calls at all. Missing or unknown answers are not kept and are asked
+again next run.
+
+Set CATEGORIZE_BACKEND=local to use only the local classifier, or stub to
+use a stand-in model whose answers are never saved.
+"""
+import json
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import database
+from webscraping import state as scrape_state
+
+# The interests the extension lets users pick
+CATEGORIES = ("Arts", "Academics", "Career", "Culture", "Diversity", "Health", "Social", "Sports", "Tech", "Community")
+
+# The model's answer when no category fits a title
+NO_CATEGORY = "None"
+
+BATCH_SIZE = 25
+WORKERS = 4
+CACHE = "categories"
+
+# Local answers at least this sure are used without asking the model
+CONFIDENCE = 0.5
+
+KEYWORDS = {
+    "Arts": "art arts music concert theatre theater dance film gallery exhibit exhibition poetry orchestra choir jazz opera painting photography recital symphony",
+    "Academics": "lecture seminar workshop study tutoring exam research thesis dissertation colloquium symposium defense library writing",
+    "Career": "career job jobs internship resume interview networking employer recruiting hiring professional",
+    "Culture": "cultural culture heritage festival tradition international lunar diwali hispanic latinx asian native indigenous",
+    "Diversity": "diversity inclusion equity lgbtq pride queer women black multicultural disability identity",
+    "Health": "health wellness yoga meditation fitness counseling mental nutrition vaccine flu mindfulness stress",
+    "Social": "social party mixer trivia movie karaoke bingo hangout welcome celebration",
+    "Sports": "basketball football baseball softball soccer volleyball tennis golf swim swimming athletics tournament intramural",
+    "Tech": "tech technology hackathon coding code programming software ai cyber cybersecurity robotics data computer engineering",
+    "Community": "volunteer volunteering service community donation drive food pantry cleanup fundraiser charity",
+}
+
+STOPWORDS = {"a", "an", "and", "at", "for", "in", "of", "on", "or", "the", "to", "with", "unlv", "vs"}
+
+def tokens(title):
+    words = re.findall(r"[a-z0-9]+", title.lower())
+    # Crude plural folding so "workshops" matches "workshop"
+    return [word[:-1] if len(word) > 3 and word.endswith("s") else word for word in words if word not in STOPWORDS]
+
+class LocalClassifier:
+    """
+    Keyword rules plus a TF-IDF nearest-centroid model over already categorized titles.
+    predict() returns (category or None, confidence between 0 and 1).
+    """
+    def __init__(self, examples=()):
+        self.keywords = {}
+        for category, words in KEYWORDS.items():
+            for word in tokens(words):
+                self.keywords[word] = category
+        examples = [(tokens(title), category) for title, category in examples if category in CATEGORIES]
+        document_frequency = Counter(word for words, _ in examples for word in set(words))
+        self.idf = {word: math.log((1 + len(examples)) / (1 + count)) + 1 for word, count in document_frequency.items()}
+        sums = defaultdict(Counter)
+        for words, category in examples:
+            for word, weight in self.vector(words).items():
+                sums[category][word] += weight
+        self.centroids = {category: normalized(weights) for category, weights in sums.items()}
+
+    def vector(self, words):
+        counts = Counter(word for word in words if word in self.idf)
+        return normalized({word: count * self.idf[word] for word, count in counts.items()})
+
+    def predict(self, title):
+        words = tokens(title)
+        hits = Counter(self.keywords[word] for word in words if word in self.keywords)
+        ranked = hits.most_common(2)
+        if ranked and (len(ranked) == 1 or ranked[0][1] > ranked[1][1]):
+            return ranked[0][0], 0.9
+        vector = self.vector(words)
+        scores = sorted(((sum(weight * centroid.get(word, 0) for word, weight in vector.items()), category)
+                         for category, centroid in self.centroids.items()), reverse=True)
+        if not scores or scores[0][0] == 0:
+            # A keyword tie is still a better guess than nothing
+            return (ranked[0][0], 0.4) if ranked else (None, 0)
+        return scores[0][1], scores[0][0]
+
+def normalized(weights):
+    length = math.sqrt(sum(weight * weight for weight in weights.values()))
+    return {word: weight / length for word, weight in weights.items()} if length else {}
+
+def training_examples(cache):
+    # Model answers from the cache, plus every UNLV calendar event that has a category
+    examples = [(title, category) for title, category in cache.items() if category]
+    try:
+        examples += [(row['name'], row['category']) for row in database.rows("unlvcalendar") if row.get('category')]
+    except Exception as e:
+        print(f"[Error] Could not load categorized events: {e}")
+    return examples
+
+class OpenAIBackend:
+    model = "gpt-3.5-turbo"
+    # Answers are worth keeping across runs
+    persist = True
+
+    def __init__(self, client=None):
+        if client is None:
+            # Reads OPENAI_API_KEY
+            from openai import OpenAI
+            client = OpenAI()
+        self.client = client
+
+    def categorize(self, titles):
+        numbered = "\n".join(f"{i}. {title}" for i, title in enumerate(titles, 1))
+        prompt = f"""
+        Choose the most appropriate category for each of these event titles from this list:
+        {", ".join(CATEGORIES)}
+
+        {numbered}
+
+        Answer with a JSON object mapping each title's number to its category name.
+        If no category fits a title, use "{NO_CATEGORY}".
+        """
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": "You are an assistant that classifies event titles into categories."},
+                {"role": "user", "content": prompt}
+            ],
+            response_format={"type": "json_object"},
+            temperature=0  # deterministic response
+        )
+        answers = json.loads(response.choices[0].message.content)
+        return [answers.get(str(i)) for i in range(1, len(titles) + 1)]
+
+class StubBackend:
+    """
+    Answers from a fixed title -> category dict, counting the batches it was asked.
+    Its answers stay out of the state directory unless persist is set.
+    """
+    def __init__(self, answers=None, persist=False):
+        self.answers = answers or {}
+        self.persist = persist
+        self.batches = []
+
+    def categorize(self, titles):
+        self.batches.append(list(titles))
+        return [self.answers.get(title) for title in titles]
+
+def default_backend():
+    choice = os.environ.get('CATEGORIZE_BACKEND')
+    if choice == 'local':
+        return None
+    if choice == 'stub':
+        return StubBackend()
+    return OpenAIBackend()
+
+def ask(backend, titles):
+    """
+    Dict of title -> category (None when no category fits) for one batch.
+    Titles with a missing or unknown answer are left out, and the whole batch
+    when the backend failed, so they are retried next run.
+    """
+    try:
+        answers = list(backend.categorize(titles))
+    except Exception as e:
+        print(f"[Error] AI categorization failed for {len(titles)} titles: {e}")
+        return {}
+    valid = {}
+    for title, answer in zip(titles, answers):
+        if answer in CATEGORIES:
+            valid[title] = answer
+        elif answer == NO_CATEGORY:
+            valid[title] = None
+    if len(valid) < len(titles):
+        print(f"[Error] AI categorization gave no valid answer for {len(titles) - len(valid)} titles")
+    return valid
+
+def categorize(titles, backend=None, classifier=None):
+    """
+    Return a dict of title -> category (None when no category fits).
+    Titles the local classifier is sure of, and titles the model already answered, cost no model call.
+    """
+    cache = scrape_state.load(CACHE)
+    known = cache.setdefault('titles', {})
+    missing = sorted({title for title in titles if title not in known})
+    if not missing:
+        return {title: known[title] for title in titles}
+
+    classifier = classifier or LocalClassifier(training_examples(known))
+    guesses = {title: classifier.predict(title) for title in missing}
+    result = {title: category for title, (category, _) in guesses.items()}
+    unsure = [title for title, (_, confidence) in guesses.items() if confidence < CONFIDENCE]
+    if unsure:
+        try:
+            backend = backend or default_backend()
+        except Exception as e:
+            print(f"[Error] AI categorization unavailable: {e}")
+            backend = None
+        if backend is not None:
+            batches = [unsure[i:i + BATCH_SIZE] for i in range(0, len(unsure), BATCH_SIZE)]
+            with ThreadPoolExecutor(max_workers=min(WORKERS, len(batches))) as pool:
+                for answers in pool.map(lambda batch: ask(backend, batch), batches):
+                    # Titles without a valid answer keep the local guess and are asked again next run
+                    known.update(answers)
+                    result.update(answers)
+            if getattr(backend, 'persist', True):
+                scrape_state.save(CACHE, cache)
+    return {title: known[title] if title in known else result[title] for title in titles}
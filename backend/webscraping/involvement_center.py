@@ -1,30 +1,72 @@
-import requests
 import json
+import hashlib
 from datetime import datetime
 from pytz import timezone
-from database import BASE
+from webscraping import pages, state as scrape_state
+from webscraping.scraper import Scraper
 
 URL = "https://involvementcenter.unlv.edu/api/discovery/event/search?"
-QUERY = f"endsAfter={datetime.today()}&orderByField=endsOn&orderByDirection=ascending&status=Approved&take=9999"
+QUERY = "endsAfter={}&orderByField=endsOn&orderByDirection=ascending&status=Approved&skip={}&take={}"
+# Events per request
+PAGE_SIZE = 100
+STATE = "involvement_center"
+
+class InvolvementCenter(Scraper):
+    name = STATE
+    table = "involvementcenter"
+    upsert = True
+
+    async def fetch(self, client, run):
+        run.seen = {} if run.force else scrape_state.load(STATE).get('seen', {})
+        run.fingerprints = {}
+        run.changed = []
+        # Page through every approved event that has not ended yet
+        ends_after = datetime.today()
+        skip = 0
+        while True:
+            response = await client.get(URL + QUERY.format(ends_after, skip, PAGE_SIZE))
+            response.raise_for_status()
+            events = response.json()['value']
+            yield events
+            if len(events) < PAGE_SIZE:
+                break
+            skip += PAGE_SIZE
+
+    def parse(self, page, run):
+        return page
+
+    def map(self, event_json, run):
+        # Only events that are new or changed since the last run are ingested
+        event = map_event(event_json)
+        event_id = str(event_json['id'])
+        run.fingerprints[event_id] = fingerprint(event)
+        if run.seen.get(event_id) == run.fingerprints[event_id]:
+            return None
+        run.changed.append(event_id)
+        return event
+
+    def finish(self, run):
+        # Rows the API rejected are tried again next run
+        for result in run.report['results']:
+            if result['status'] == 'error':
+                del run.fingerprints[run.changed[result['index']]]
+        # Events that ended drop out of the search, and so out of the state
+        scrape_state.save(STATE, {'checked': datetime.today().isoformat(), 'seen': run.fingerprints})
+
+SCRAPER = InvolvementCenter()
 
 def scrape():
-    response = requests.get(URL+QUERY)
-    json_data = response.json()
-    events = json_data['value']
-    results = []
-    for event in events:
-        event = map_event(event)
-        results.append(event)
-    
+    results = SCRAPER.scrape()
+
     # with open('scraped_InvolvementCenter.json', 'w', encoding='utf-8') as f:
     #     json.dump(results, f, indent=4)
     return results
 
-def default():
-    results = scrape()
-    # PUT events into database
-    for event in results:
-        requests.put(BASE + "involvementcenter_add", json=event)
+def fingerprint(event):
+    return hashlib.sha1(json.dumps(event, sort_keys=True).encode()).hexdigest()
+
+def default(force=False):
+    return SCRAPER.default(force)
 
 def map_event(event_json):
     start = event_json['startsOn']
@@ -50,8 +92,12 @@ def map_event(event_json):
         'endTime': endTime,
         'location': event_json['location'],
         'organization': event_json['organizationName'],
-        'link': f"https://involvementcenter.unlv.edu/event/{event_json['id']}"
+        'link': f"https://involvementcenter.unlv.edu/event/{event_json['id']}",
+        'source_id': str(event_json['id'])
     }
 
+def main():
+    default(force=pages.force_flag("Scrape upcoming Involvement Center events into the database"))
+
 if __name__ == '__main__':
-    default()
+    main()
@@ -0,0 +1,97 @@
+"""
+Runs the scrapers concurrently in the background and records how each one went
+"""
+import asyncio
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from webscraping import academic_calendar, involvement_center, organizations, rebel_coverage, unlv_calendar
+from webscraping.scraper import Scraper, new_client
+
+# Scrapers to run, a plain function returning a bulk add report works too
+SOURCES = {
+    'academic_calendar': academic_calendar.SCRAPER,
+    'involvement_center': involvement_center.SCRAPER,
+    'organizations': organizations.SCRAPER,
+    'rebel_coverage': rebel_coverage.SCRAPER,
+    'unlv_calendar': unlv_calendar.SCRAPER,
+}
+
+# How many finished jobs to remember for /scrape_status
+JOB_HISTORY = 20
+
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+
+class ScrapeJob:
+    def __init__(self, sources):
+        self.id = uuid.uuid4().hex
+        self.started = time.time()
+        self.finished = None
+        self._lock = threading.Lock()
+        self.sources = {name: {'status': 'pending'} for name in sources}
+
+    async def run(self, sources):
+        # All scrapers share one event loop and HTTP client
+        async with new_client() as client:
+            await asyncio.gather(*(self.run_source(name, source, client) for name, source in sources.items()))
+
+    async def run_source(self, name, source, client):
+        begin = time.perf_counter()
+        self._update(name, status='running')
+        try:
+            if isinstance(source, Scraper):
+                report = await source.run(client)
+            else:
+                report = await asyncio.to_thread(source)
+            report = report or {}
+            # Keep the counts (created, updated, duplicate, ...) but not the per-row results
+            result = {key: value for key, value in report.items() if key != 'results'}
+            result['status'] = 'done'
+        except Exception as e:
+            traceback.print_exc()
+            result = {'status': 'failed', 'message': f"{type(e).__name__}: {e}"}
+        self._update(name, seconds=round(time.perf_counter() - begin, 3), **result)
+
+    def _update(self, name, **values):
+        with self._lock:
+            self.sources[name].update(values)
+            if all(source['status'] in ('done', 'failed') for source in self.sources.values()):
+                self.finished = time.time()
+
+    def report(self):
+        with self._lock:
+            if self.finished is None:
+                status = 'running'
+            elif any(source['status'] == 'failed' for source in self.sources.values()):
+                status = 'failed'
+            else:
+                status = 'done'
+            return {
+                'job': self.id,
+                'status': status,
+                'started': self.started,
+                'finished': self.finished,
+                'seconds': round((self.finished or time.time()) - self.started, 3),
+                'sources': {name: dict(source) for name, source in self.sources.items()}
+            }
+
+def start(sources=None):
+    """Start scraping the given sources (default: all) in parallel and return the job."""
+    sources = {name: SOURCES[name] for name in (sources or SOURCES)}
+    job = ScrapeJob(sources)
+    with _jobs_lock:
+        _jobs[job.id] = job
+        # Forget the oldest finished jobs, never one that is still running
+        finished = [job_id for job_id, known in _jobs.items() if known.finished is not None]
+        for job_id in finished[:max(0, len(finished) - JOB_HISTORY)]:
+            del _jobs[job_id]
+    # The request does not wait for the job
+    threading.Thread(target=asyncio.run, args=(job.run(sources),), name=f"scrape-{job.id[:8]}", daemon=True).start()
+    return job
+
+def get(job_id):
+    with _jobs_lock:
+        return _jobs.get(job_id)
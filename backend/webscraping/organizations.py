@@ -1,29 +1,36 @@
 
-import requests
 import json
-from database import BASE
+from webscraping.scraper import Scraper
 
 URL = "https://involvementcenter.unlv.edu/api/discovery/search/organizations?"
 QUERY = "orderBy%5B0%5D=UpperName%20asc&top=9999&filter=&query=&skip=0"
 
+class Organizations(Scraper):
+    name = "organizations"
+    table = "organization"
+
+    async def fetch(self, client, run):
+        response = await client.get(URL+QUERY)
+        response.raise_for_status()
+        yield response.json()
+
+    def parse(self, page, run):
+        return page['value']
+
+    def map(self, org, run):
+        return map_event(org)
+
+SCRAPER = Organizations()
+
 def scrape():
-    response = requests.get(URL+QUERY)
-    json_data = response.json()
-    orgs = json_data['value']
-    results = []
-    for org in orgs:
-        org = map_event(org)
-        results.append(org)
-    
+    results = SCRAPER.scrape()
+
     # with open('scraped_Organizations.json', 'w', encoding='utf-8') as f:
     #     json.dump(results, f, indent=4)
     return results
 
 def default():
-    results = scrape()
-    # PUT events into database
-    for org in results:
-        requests.put(BASE + "organization_add", json=org)
+    return SCRAPER.default()
 
 def map_event(org_json):
     return {
@@ -0,0 +1,65 @@
+"""
+Conditional page fetches, so an unchanged page is neither parsed nor ingested
+
+The ETag, Last-Modified and a hash of the body of the last ingested copy of a
+page are kept in the scraper's state file and sent back as If-None-Match /
+If-Modified-Since. Servers that ignore those still get caught by the hash.
+"""
+import argparse
+import hashlib
+from webscraping import state as scrape_state
+from webscraping.scraper import Scraper
+
+def content_hash(response):
+    return hashlib.sha256(response.content).hexdigest()
+
+async def fetch(client, name, url, force=False, headers=None):
+    """
+    GET url and return the response, or None when it is the same page remember(name, ...) last saw.
+    force skips the check and always returns the page.
+    """
+    seen = {} if force else scrape_state.load(name).get('page', {})
+    headers = dict(headers or {})
+    if seen.get('etag'):
+        headers['If-None-Match'] = seen['etag']
+    if seen.get('last_modified'):
+        headers['If-Modified-Since'] = seen['last_modified']
+    response = await client.get(url, headers=headers)
+    if response.status_code == 304:
+        return None
+    response.raise_for_status()
+    if seen.get('hash') == content_hash(response):
+        return None
+    return response
+
+def remember(name, response):
+    # Call once the page has been ingested, a failed run is retried in full next time
+    state = scrape_state.load(name)
+    state['page'] = {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'hash': content_hash(response)
+    }
+    scrape_state.save(name, state)
+
+class PageScraper(Scraper):
+    """A source that is one HTML page at url, skipped while it has not changed."""
+    url = None
+    headers = None
+
+    async def fetch(self, client, run):
+        run.response = await fetch(client, self.name, self.url, run.force, self.headers)
+        if run.response is None:
+            run.report['page'] = 'unchanged'
+            return
+        yield run.response.text
+
+    def finish(self, run):
+        if run.report['results']:
+            remember(self.name, run.response)
+
+def force_flag(description):
+    # Command line for the console scripts in setup.py
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--force", action="store_true", help="scrape everything, even what has not changed since the last run")
+    return parser.parse_args().force
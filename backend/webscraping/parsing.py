@@ -0,0 +1,30 @@
+"""
+HTML parsing for the scrapers
+
+BeautifulSoup is only the tree API, most of the time goes to the parser
+underneath. lxml is used when it is installed and html.parser otherwise;
+set SCRAPE_HTML_PARSER (lxml, html.parser, html5lib) to pick one.
+"""
+import os
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.builder import builder_registry
+
+# Fastest first
+PREFERRED = ("lxml", "html.parser")
+
+def default_parser():
+    for name in PREFERRED:
+        if builder_registry.lookup(name):
+            return name
+    return "html.parser"
+
+PARSER = os.environ.get('SCRAPE_HTML_PARSER') or default_parser()
+
+def soup(html, only=None, parser=None):
+    """
+    Parse html with the configured parser.
+    only is a SoupStrainer, or tag name, so that just the matching parts of the page are built.
+    """
+    if isinstance(only, str):
+        only = SoupStrainer(only)
+    return BeautifulSoup(html, parser or PARSER, parse_only=only)
@@ -0,0 +1,174 @@
+"""
+Common shape of a scraper: fetch -> parse -> map -> ingest
+
+A source subclasses Scraper, names its state file and table, and fills in
+the stages. run() fetches with a shared httpx.AsyncClient, parses every page
+on a worker thread, and hands rows to ingest in batches of batch_size while
+the next pages are still being fetched and parsed. Many scrapers can share
+one event loop and client, see webscraping.orchestrator.
+
+    class Example(Scraper):
+        name = "example"
+        table = "unlvcalendar"
+
+        async def fetch(self, client, run):
+            response = await client.get("https://example.com/events")
+            response.raise_for_status()
+            yield response.text
+
+        def parse(self, page, run):
+            return parse_html(page)
+
+    Example().default()
+"""
+import asyncio
+from collections import defaultdict
+import httpx
+from database import ingest
+from webscraping import session
+
+# Same timeouts, retries and per-host limit as the blocking session
+TIMEOUT = httpx.Timeout(session.TIMEOUT[1], connect=session.TIMEOUT[0])
+LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+class PoliteTransport(httpx.AsyncBaseTransport):
+    """
+    Retries connection errors, 429s and 5xx answers with exponential backoff
+    and keeps at most per_host requests in flight to one host.
+    """
+    def __init__(self, transport=None, retries=session.RETRIES, backoff=session.BACKOFF, per_host=session.PER_HOST):
+        self.transport = transport or httpx.AsyncHTTPTransport(retries=retries, limits=LIMITS)
+        self.retries = retries
+        self.backoff = backoff
+        self.hosts = defaultdict(lambda: asyncio.Semaphore(per_host))
+
+    async def handle_async_request(self, request):
+        async with self.hosts[request.url.host]:
+            for attempt in range(self.retries + 1):
+                response = await self.transport.handle_async_request(request)
+                if response.status_code not in RETRY_STATUS or attempt == self.retries:
+                    return response
+                retry_after = response.headers.get('Retry-After', '')
+                await response.aclose()
+                await asyncio.sleep(int(retry_after) if retry_after.isdigit() else self.backoff * 2 ** attempt)
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+def new_client(transport=None):
+    return httpx.AsyncClient(timeout=TIMEOUT, transport=PoliteTransport(transport), follow_redirects=True)
+
+def empty_report():
+    return {'created': 0, 'updated': 0, 'unchanged': 0, 'duplicate': 0, 'conflict': 0, 'error': 0, 'results': []}
+
+class Run:
+    """State of one run of a scraper, handed to every stage."""
+    def __init__(self, force=False):
+        self.force = force
+        self.report = empty_report()
+        self.rows = 0
+
+    def merge(self, report):
+        # Row indexes in a batch's report become indexes into the whole run
+        for key, value in report.items():
+            if key == 'results':
+                self.report['results'] += [dict(result, index=result['index'] + self.rows) for result in value]
+            elif isinstance(value, int):
+                self.report[key] = self.report.get(key, 0) + value
+
+# Marks the end of the pages from fetch()
+DONE = object()
+
+class Scraper:
+    # State file name, also the name in /scrape_status
+    name = None
+    # Endpoint prefix of the table the rows go to
+    table = None
+    # Update changed rows in place instead of counting them as duplicates
+    upsert = False
+    batch_size = 500
+
+    async def fetch(self, client, run):
+        """Yield the pages to parse; yield nothing when the source has not changed."""
+        raise NotImplementedError
+        yield
+
+    def parse(self, page, run):
+        """Return the items on one page. Runs on a worker thread."""
+        raise NotImplementedError
+
+    def map(self, item, run):
+        """Return the row to ingest for one item, or None to leave it out."""
+        return item
+
+    def finish(self, run):
+        """Called once every row has been ingested, e.g. to save state."""
+
+    def ingest(self, rows):
+        return ingest(self.table, rows, upsert=self.upsert)
+
+    async def rows(self, client, run):
+        # The next page is fetched while this one is parsed
+        pages = asyncio.Queue(maxsize=2)
+        async def produce():
+            try:
+                async for page in self.fetch(client, run):
+                    await pages.put(page)
+            except Exception as e:
+                # Handed over in place of a page, so the error surfaces in run()
+                await pages.put(e)
+                return
+            await pages.put(DONE)
+        producer = asyncio.create_task(produce())
+        try:
+            while (page := await pages.get()) is not DONE:
+                if isinstance(page, Exception):
+                    raise page
+                for item in await asyncio.to_thread(self.parse, page, run) or []:
+                    row = self.map(item, run)
+                    if row is not None:
+                        yield row
+        finally:
+            producer.cancel()
+
+    async def run(self, client=None, force=False):
+        """Scrape and ingest, returning the bulk add report for the whole run."""
+        if client is None:
+            async with new_client() as client:
+                return await self.run(client, force)
+        run = Run(force)
+        batch = []
+        pushing = None
+        async for row in self.rows(client, run):
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                # One batch in flight at a time, so rows still arrive in order
+                if pushing:
+                    await self.pushed(run, pushing)
+                pushing = (len(batch), asyncio.create_task(asyncio.to_thread(self.ingest, batch)))
+                batch = []
+        if pushing:
+            await self.pushed(run, pushing)
+        if batch:
+            await self.pushed(run, (len(batch), asyncio.create_task(asyncio.to_thread(self.ingest, batch))))
+        self.finish(run)
+        return run.report
+
+    async def pushed(self, run, pushing):
+        size, task = pushing
+        run.merge(await task)
+        run.rows += size
+
+    async def collect(self, client=None, force=True):
+        """Scrape without ingesting and return the rows."""
+        if client is None:
+            async with new_client() as client:
+                return await self.collect(client, force)
+        return [row async for row in self.rows(client, Run(force))]
+
+    def default(self, force=False):
+        return asyncio.run(self.run(force=force))
+
+    def scrape(self):
+        return asyncio.run(self.collect())
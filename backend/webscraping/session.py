@@ -0,0 +1,46 @@
+"""
+One pooled HTTP session for blocking calls, such as ingest and rows against BASE
+
+Connections are kept alive and reused per host. Requests get a default
+timeout, and connection errors, 429s and 5xx answers are retried with
+exponential backoff (honouring Retry-After). At most PER_HOST requests are
+in flight to a host at once; further requests wait for a free connection.
+The async scrapers use the same settings, see webscraping.scraper.
+"""
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Seconds to connect, seconds to wait for the response
+TIMEOUT = (5, 30)
+RETRIES = 3
+# Waits 0.5s, 1s, 2s, ... between attempts
+BACKOFF = 0.5
+PER_HOST = 4
+# Hosts with an open connection pool
+HOSTS = 10
+
+class ScraperSession(requests.Session):
+    def __init__(self, timeout=TIMEOUT, retries=RETRIES, backoff=BACKOFF, per_host=PER_HOST):
+        super().__init__()
+        self.timeout = timeout
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=(429, 500, 502, 503, 504),
+            # Bulk adds are safe to repeat, duplicates are dropped
+            allowed_methods=None,
+            # Hand back the last answer instead of raising, callers check status_code
+            raise_on_status=False
+        )
+        # pool_block makes the pool size the per-host concurrency limit
+        adapter = HTTPAdapter(pool_connections=HOSTS, pool_maxsize=per_host, pool_block=True, max_retries=retry)
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().request(method, url, **kwargs)
+
+session = ScraperSession()
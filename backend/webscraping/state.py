@@ -0,0 +1,24 @@
+"""
+Small JSON files that let a scraper remember what it saw on its last run
+"""
+import json
+import os
+
+# One <name>.json per scraper, kept out of git
+STATE_DIR = os.environ.get('SCRAPE_STATE_DIR', os.path.join(os.path.dirname(__file__), 'state'))
+
+def load(name):
+    try:
+        with open(os.path.join(STATE_DIR, f"{name}.json"), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        # First run, or a half written file: start over with a full scrape
+        return {}
+
+def save(name, state):
+    os.makedirs(STATE_DIR, exist_ok=True)
+    path = os.path.join(STATE_DIR, f"{name}.json")
+    # Write then rename so a crash never leaves a truncated file behind
+    with open(path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(path + ".tmp", path)
@@ -1,16 +1,19 @@
-export async function fetchEvents(today, viewMode="daily") {
+/**
+ * Fetches all four event sources for a view in one request.
+ * `filters` can hold `sources`, `organizations`, `sports` and `categories` arrays;
+ * the server only returns matching events. An empty array matches nothing.
+ */
+export async function fetchEvents(today, viewMode="daily", filters={}) {
   try {
-    const [res1, res2, res3, res4] = await Promise.all([
-      fetch(`http://franklopez.tech:5050/academiccalendar_${viewMode}/${today}`),
-      fetch(`http://franklopez.tech:5050/involvementcenter_${viewMode}/${today}`),
-      fetch(`http://franklopez.tech:5050/rebelcoverage_${viewMode}/${today}`),
-      fetch(`http://franklopez.tech:5050/unlvcalendar_${viewMode}/${today}`)
-    ]);
-
-    const [data1, data2, data3, data4] = await Promise.all([
-      res1.json(), res2.json(), res3.json(), res4.json()
-    ]);
-    return [data1, data2, data3, data4];
+    const params = new URLSearchParams();
+    for (const [key, values] of Object.entries(filters)) {
+      if (values.length === 0) params.append(key, "");
+      values.forEach((value) => params.append(key, value));
+    }
+    const query = params.toString() ? `?${params}` : "";
+    const res = await fetch(`http://franklopez.tech:5050/events/${viewMode}/${today}${query}`);
+    const data = await res.json();
+    return [data.academiccalendar, data.involvementcenter, data.rebelcoverage, data.unlvcalendar];
   } catch (err) {
     console.error('Error fetching events:', err);
     return [null, null, null, null];
@@ -2,29 +2,29 @@
 import { fetchEvents } from "./fetch-events";
 
 export async function filterEvents(today, viewMode) {
-  const [ac, ic, rc, uc] = await fetchEvents(today, viewMode);
+  const storageData = await new Promise((resolve) => {
+    chrome.storage.sync.get(["selectedSports", "selectedInterests", "preferences", "involvedClubs"], resolve);
+  });
+  const preferences = storageData.preferences || {};
+
+  // Only ask for the sources the user turned on; the server filters them by the user's picks
+  const sources = [
+    preferences.academicCalendar && "academiccalendar",
+    preferences.involvementCenter && "involvementcenter",
+    preferences.rebelCoverage && "rebelcoverage",
+    preferences.UNLVCalendar && "unlvcalendar",
+  ].filter(Boolean);
+  if (sources.length === 0) {
+    return [[], [], [], []];
+  }
 
-  return new Promise((resolve) => {
-    chrome.storage.sync.get(["selectedSports", "selectedInterests", "preferences", "involvedClubs"], (storageData) => {
-      const selectedInterests = storageData.selectedInterests || [];
-      const selectedSports = storageData.selectedSports || [];
-      const involvedClubs = storageData.involvedClubs || [];
-      const preferences = storageData.preferences || {};
-    
-      const filteredAC = preferences.academicCalendar ? ac : [];
-      const filteredIC = preferences.involvementCenter
-        ? Array.isArray(ic) ? ic.filter((e) => involvedClubs.includes(e.organization)) : []
-        : [];
-      const filteredRC = preferences.rebelCoverage
-      ? Array.isArray(rc) ? rc.filter((e) => selectedSports.includes(e.sport))
-      : []
-      : [];
-      const filteredUC = preferences.UNLVCalendar
-        ? Array.isArray(uc) ? uc.filter((e) => selectedInterests.includes(e.category)) : []
-        : [];
-          
-      resolve([filteredAC, filteredIC, filteredRC, filteredUC]);
-    });
-    
+  const [ac, ic, rc, uc] = await fetchEvents(today, viewMode, {
+    sources,
+    organizations: storageData.involvedClubs || [],
+    sports: storageData.selectedSports || [],
+    categories: storageData.selectedInterests || [],
   });
+
+  const safeArray = (data) => Array.isArray(data) ? data : [];
+  return [safeArray(ac), safeArray(ic), safeArray(rc), safeArray(uc)];
 }